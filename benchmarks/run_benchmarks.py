@@ -0,0 +1,76 @@
+"""
+线程池微基准测试
+
+用法:
+    python benchmarks/run_benchmarks.py                     # 和基线比较，回退超过阈值时失败
+    python benchmarks/run_benchmarks.py --update-baseline   # 把本次结果保存为新的基线
+
+基线保存在 benchmarks/baseline.json，和机器相关，不提交到仓库。
+"""
+
+import sys
+import os
+
+# 引用公共模块
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tasks', 'common'))
+from utils import Autograder
+from benchmark import benchmark_part
+
+import subprocess
+
+# ==============================================================================
+# 配置
+# ==============================================================================
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARK_DIR)
+SOURCE_FILE = os.path.join(BENCHMARK_DIR, "threadpool_bench.cpp")
+HEADER_FILE = os.path.join(ROOT_DIR, "threadpool.h")
+EXECUTABLE = os.path.join(BENCHMARK_DIR, "threadpool_bench")
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+SAMPLES = "15"
+
+
+# ==============================================================================
+# 测试环境
+# ==============================================================================
+
+def build_benchmarks():
+    """开启优化编译基准测试程序"""
+    result = subprocess.run(
+        ["g++", "-std=c++14", "-O2", "-pthread", "-o", EXECUTABLE, SOURCE_FILE],
+        capture_output=True,
+        text=True,
+        cwd=BENCHMARK_DIR
+    )
+    if result.returncode != 0:
+        raise AssertionError(f"编译失败:\n{result.stderr}")
+    return True
+
+
+def cleanup_benchmarks():
+    if os.path.exists(EXECUTABLE):
+        os.remove(EXECUTABLE)
+    return True
+
+
+def benchmark(prefix: str):
+    return benchmark_part([EXECUTABLE, "--samples", SAMPLES, "--filter", prefix], BASELINE_FILE, cwd=BENCHMARK_DIR)
+
+
+# ==============================================================================
+# 主入口
+# ==============================================================================
+
+if __name__ == "__main__":
+    grader = Autograder("benchmarks")
+    grader.setup = build_benchmarks
+    grader.teardown = cleanup_benchmarks
+    grader.add_inputs([SOURCE_FILE, HEADER_FILE])
+
+    grader.add_benchmark("线程创建和销毁 (Thread::start)", benchmark("thread_"))
+    grader.add_benchmark("任务提交 (submitTask)", benchmark("submit_"))
+    grader.add_benchmark("packaged_task / future 开销", benchmark("future_"))
+
+    exit(grader.run(["--benchmark", *sys.argv[1:]]))
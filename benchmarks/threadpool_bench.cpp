@@ -0,0 +1,274 @@
+// threadpool_bench.cpp : 线程池微基准测试
+//
+// 用法: threadpool_bench [--samples N] [--filter 名称前缀]
+// 每个基准测试重复运行 N 次，每次执行 iterations 个操作，
+// 每行输出一个基准测试的 JSON 结果（每个操作的平均耗时，单位纳秒），统计和基线比较由 tasks/common/benchmark.py 完成
+
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <vector>
+#include <atomic>
+#include <thread>
+#include <future>
+#include <functional>
+#include <chrono>
+#include <climits>
+#include <cstdlib>
+#include "../threadpool.h"
+
+using namespace std;
+using Clock = chrono::steady_clock;
+
+struct Options
+{
+    int samples = 15;
+    string filter;
+    ostream* out = &cout;
+};
+
+// 丢弃所有输出的缓冲区
+struct NullBuffer : streambuf
+{
+    int overflow(int c) override { return c; }
+};
+
+// 防止编译器把被测代码优化掉
+atomic<long long> g_sink{ 0 };
+
+double elapsedNs(Clock::time_point start)
+{
+    return chrono::duration<double, nano>(Clock::now() - start).count();
+}
+
+// body(n) 执行 n 个操作，返回这 n 个操作的总耗时（纳秒），准备和清理工作不计入耗时
+template<typename Body>
+void runBenchmark(const Options& options, const string& name, int iterations, Body body)
+{
+    if (name.compare(0, options.filter.size(), options.filter) != 0)
+        return;
+
+    body(max(1, iterations / 10)); // 预热
+
+    ostringstream out;
+    out << "{\"name\": \"" << name << "\", \"unit\": \"ns/op\", \"iterations\": " << iterations << ", \"samples\": [";
+    for (int i = 0; i < options.samples; i++)
+    {
+        out << (i ? ", " : "") << body(iterations) / iterations;
+    }
+    out << "]}";
+    *options.out << out.str() << endl;
+}
+
+// 等待计数器达到目标值
+void spinUntil(const atomic<int>& counter, int target)
+{
+    while (counter.load(memory_order_acquire) < target)
+        this_thread::yield();
+}
+
+// ==============================================================================
+// 线程创建和销毁
+// ==============================================================================
+
+void benchThreads(const Options& options)
+{
+    // Thread::start: 创建并分离线程，直到线程函数开始执行（MODE_CACHED 每次扩容都要付出这个开销）
+    runBenchmark(options, "thread_spawn", 100, [](int n) {
+        atomic<int> started{ 0 };
+        vector<Thread> threads;
+        threads.reserve(n);
+        for (int i = 0; i < n; i++)
+            threads.emplace_back([&started](int) { started.fetch_add(1, memory_order_release); });
+
+        auto start = Clock::now();
+        for (auto& t : threads)
+            t.start();
+        spinUntil(started, n);
+        double ns = elapsedNs(start);
+
+        // 分离的线程没有办法 join，留一点时间让它们退出，避免影响下一轮
+        this_thread::sleep_for(chrono::milliseconds(5));
+        return ns;
+    });
+
+    // 作为对照: 创建线程并 join，包含线程退出的开销
+    runBenchmark(options, "thread_spawn_join", 100, [](int n) {
+        auto start = Clock::now();
+        for (int i = 0; i < n; i++)
+        {
+            thread t([] { g_sink.fetch_add(1, memory_order_relaxed); });
+            t.join();
+        }
+        return elapsedNs(start);
+    });
+}
+
+// ==============================================================================
+// 任务提交
+// ==============================================================================
+
+// producers个线程同时开始提交，返回全部提交完成的耗时
+double submitContended(ThreadPool& pool, int producers, int n)
+{
+    vector<vector<future<int>>> results(producers);
+    atomic<int> ready{ 0 };
+    atomic<bool> go{ false };
+    atomic<int> finished{ 0 };
+    vector<thread> threads;
+    for (int p = 0; p < producers; p++)
+    {
+        threads.emplace_back([&, p]() {
+            results[p].reserve(n / producers);
+            ready.fetch_add(1);
+            while (!go.load(memory_order_acquire))
+                this_thread::yield();
+            for (int i = 0; i < n / producers; i++)
+                results[p].push_back(pool.submitTask([](int x) { return x; }, i));
+            finished.fetch_add(1, memory_order_release);
+        });
+    }
+    spinUntil(ready, producers);
+
+    auto start = Clock::now();
+    go.store(true, memory_order_release);
+    spinUntil(finished, producers);
+    double ns = elapsedNs(start);
+
+    for (auto& t : threads)
+        t.join();
+    for (auto& rs : results)
+        for (auto& r : rs)
+            g_sink.fetch_add(r.get(), memory_order_relaxed);
+    return ns;
+}
+
+void benchSubmit(const Options& options)
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.start(2);
+
+    // 单个生产者的入队开销，不等待任务执行完成
+    runBenchmark(options, "submit_enqueue", 10000, [&pool](int n) {
+        vector<future<int>> results;
+        results.reserve(n);
+
+        auto start = Clock::now();
+        for (int i = 0; i < n; i++)
+            results.push_back(pool.submitTask([](int x) { return x; }, i));
+        double ns = elapsedNs(start);
+
+        for (auto& r : results)
+            g_sink.fetch_add(r.get(), memory_order_relaxed);
+        return ns;
+    });
+
+    // 多个生产者同时提交任务，耗时按总任务数平均
+    const int producers = 4;
+    runBenchmark(options, "submit_contended_4", 10000, [&pool, producers](int n) {
+        return submitContended(pool, producers, n);
+    });
+
+    // 同样的生产者数量，每个生产者有自己的分片，提交和唤醒都只获取自己分片的锁
+    ThreadPool shardedPool;
+    shardedPool.setTaskQueMaxThreshHold(INT_MAX);
+    shardedPool.setTaskQueShards(producers);
+    shardedPool.start(2);
+    runBenchmark(options, "submit_contended_4_sharded", 10000, [&shardedPool, producers](int n) {
+        return submitContended(shardedPool, producers, n);
+    });
+
+    // 按值接收大参数的任务，提交时移动参数，任务保存和执行时都不应该再拷贝
+    const size_t payloadSize = 256 * 1024;
+    runBenchmark(options, "submit_large_payload", 200, [&pool, payloadSize](int n) {
+        vector<vector<char>> payloads(n, vector<char>(payloadSize, 1));
+
+        auto start = Clock::now();
+        for (int i = 0; i < n; i++)
+            g_sink.fetch_add(pool.submitTask([](vector<char> data) { return (long long)data.size(); },
+                std::move(payloads[i])).get(), memory_order_relaxed);
+        return elapsedNs(start);
+    });
+
+    // 作为对照: 同样的任务，参数以左值传入，提交时拷贝一次
+    runBenchmark(options, "submit_large_payload_copy", 200, [&pool, payloadSize](int n) {
+        vector<vector<char>> payloads(n, vector<char>(payloadSize, 1));
+
+        auto start = Clock::now();
+        for (int i = 0; i < n; i++)
+            g_sink.fetch_add(pool.submitTask([](vector<char> data) { return (long long)data.size(); },
+                payloads[i]).get(), memory_order_relaxed);
+        return elapsedNs(start);
+    });
+
+    // 提交任务并等待结果: 入队 + 唤醒工作线程 + 执行 + 通过 future 返回的完整延迟
+    runBenchmark(options, "submit_roundtrip", 2000, [&pool](int n) {
+        auto start = Clock::now();
+        for (int i = 0; i < n; i++)
+            g_sink.fetch_add(pool.submitTask([](int x) { return x; }, i).get(), memory_order_relaxed);
+        return elapsedNs(start);
+    });
+}
+
+// ==============================================================================
+// packaged_task / future
+// ==============================================================================
+
+void benchFuture(const Options& options)
+{
+    // submitTask 内部的包装: packaged_task + future，在同一个线程中执行和取结果
+    runBenchmark(options, "future_packaged_task", 100000, [](int n) {
+        auto start = Clock::now();
+        for (int i = 0; i < n; i++)
+        {
+            packaged_task<int()> task([i]() { return i; });
+            future<int> result = task.get_future();
+            task();
+            g_sink.fetch_add(result.get(), memory_order_relaxed);
+        }
+        return elapsedNs(start);
+    });
+
+    // 作为对照: 只通过 std::function 调用，没有共享状态
+    runBenchmark(options, "future_function_call", 100000, [](int n) {
+        auto start = Clock::now();
+        for (int i = 0; i < n; i++)
+        {
+            function<int()> task([i]() { return i; });
+            g_sink.fetch_add(task(), memory_order_relaxed);
+        }
+        return elapsedNs(start);
+    });
+}
+
+int main(int argc, char* argv[])
+{
+    Options options;
+    for (int i = 1; i < argc; i++)
+    {
+        string arg = argv[i];
+        if (arg == "--samples" && i + 1 < argc)
+            options.samples = max(1, atoi(argv[++i]));
+        else if (arg == "--filter" && i + 1 < argc)
+            options.filter = argv[++i];
+        else
+        {
+            cerr << "Usage: " << argv[0] << " [--samples N] [--filter 名称前缀]" << endl;
+            return 1;
+        }
+    }
+
+    // 线程池每取到一个任务都向 cout 输出一行日志，基准测试期间丢弃这些输出，结果写到原来的标准输出
+    ostream results(cout.rdbuf());
+    NullBuffer null;
+    options.out = &results;
+    cout.rdbuf(&null);
+
+    benchThreads(options);
+    benchSubmit(options);
+    benchFuture(options);
+
+    cout.rdbuf(results.rdbuf());
+    return 0;
+}
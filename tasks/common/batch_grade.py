@@ -0,0 +1,270 @@
+"""
+批量评测 - 并行编译和测试多份学生提交
+
+用法:
+    python tasks/common/batch_grade.py tasks/task1 submissions/ --report report.json --csv report.csv
+
+submissions/ 下的每个子目录（包含 main.cpp）或每个 .cpp 文件是一份提交，
+子目录以目录名、文件以文件名（包含 .cpp）作为提交名称，两者不会重名。
+每份提交复制到独立的临时目录中编译和测试，互不干扰。
+"""
+
+import sys
+import os
+
+# 引用公共模块
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import utils
+from utils import PartResult
+
+import argparse
+import csv
+import json
+import re
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional, Tuple
+
+# ==============================================================================
+# 配置
+# ==============================================================================
+
+COMMON_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_NAME = "main.cpp"
+RESULTS_NAME = "results.json"
+
+# 复制题目目录时跳过的文件: 评测生成的中间文件和虚拟环境
+IGNORE_PATTERNS = shutil.ignore_patterns(
+    "student_code", "test_runner.cpp", "student_impl.cpp", "combined_test.cpp",
+    "benchmark_baseline.json", "results.json",
+    "__pycache__", "pyvenv.cfg", "bin", "lib", "lib64", "include", "Scripts",
+)
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+SUMMARY_LINE = re.compile(r"测试结果: (\d+) 通过, (\d+) 失败")
+PART_LINE = re.compile(r"^(✅|❌) (.+) (通过|失败)!$")
+
+
+def default_jobs() -> int:
+    """可用的 CPU 数量"""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+# ==============================================================================
+# 评测结果
+# ==============================================================================
+
+@dataclass
+class SubmissionResult:
+    submission: str
+    status: str  # passed / failed / timeout / error
+    passed: int = 0
+    failed: int = 0
+    duration: float = 0.0
+    returncode: Optional[int] = None
+    parts: List[PartResult] = field(default_factory=list)
+    output: str = ""
+
+
+def parse_output(output: str) -> Tuple[int, int, List[PartResult]]:
+    """从评测输出中解析通过和失败的数量"""
+    text = ANSI_ESCAPE.sub("", output)
+    parts = []
+    for line in text.splitlines():
+        match = PART_LINE.match(line.strip())
+        if match:
+            parts.append(PartResult(match.group(2), "passed" if match.group(3) == "通过" else "failed"))
+
+    summary = SUMMARY_LINE.search(text)
+    if summary:
+        return int(summary.group(1)), int(summary.group(2)), parts
+    return 0, 0, parts
+
+
+def load_results(path: str) -> Optional[Tuple[int, int, List[PartResult]]]:
+    """读取评测进程写出的 JSON 结果，评测进程没有正常结束时返回 None"""
+    if not os.path.isfile(path):
+        return None
+    parts = list(utils._load_results(path).values())
+    passed = sum(1 for p in parts if p.status == "passed")
+    failed = sum(1 for p in parts if p.status == "failed")
+    return passed, failed, parts
+
+
+# ==============================================================================
+# 评测单份提交
+# ==============================================================================
+
+def find_submissions(submissions_dir: str) -> List[Tuple[str, str]]:
+    """返回 (提交名称, 源文件路径) 列表，.cpp 文件的提交名称保留扩展名，和同名目录区分开"""
+    submissions = []
+    for entry in sorted(os.listdir(submissions_dir)):
+        path = os.path.join(submissions_dir, entry)
+        if os.path.isdir(path) and os.path.isfile(os.path.join(path, SOURCE_NAME)):
+            submissions.append((entry, os.path.join(path, SOURCE_NAME)))
+        elif os.path.isfile(path) and entry.endswith(".cpp"):
+            submissions.append((entry, path))
+    return submissions
+
+
+def prepare_workspace(task_dir: str, source: str, workspace: str) -> str:
+    """在临时目录中复制题目和公共模块，用提交的代码替换 main.cpp，返回题目目录"""
+    task_copy = os.path.join(workspace, os.path.basename(os.path.normpath(task_dir)))
+    shutil.copytree(task_dir, task_copy, ignore=IGNORE_PATTERNS)
+    # task1 之后的题目通过 ../common 引用公共模块
+    shutil.copytree(COMMON_DIR, os.path.join(workspace, "common"), ignore=IGNORE_PATTERNS)
+    shutil.copyfile(source, os.path.join(task_copy, SOURCE_NAME))
+    return task_copy
+
+
+def run_autograder(task_copy: str, timeout: float) -> Tuple[Optional[int], str]:
+    """运行评测进程，超时返回 (None, 输出)"""
+    env = os.environ.copy()
+    env["AUTOGRADER_NO_BOOTSTRAP"] = "1"
+    env["PYTHONIOENCODING"] = "utf-8"
+
+    process = subprocess.Popen(
+        [sys.executable, os.path.join("autograder", "autograder.py"), "--json", RESULTS_NAME],
+        cwd=task_copy,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        start_new_session=(os.name == "posix"),
+    )
+    try:
+        output, _ = process.communicate(timeout=timeout)
+        return process.returncode, output
+    except subprocess.TimeoutExpired:
+        # 评测进程启动的测试程序在同一个进程组中，一起结束
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+        output, _ = process.communicate()
+        return None, output
+
+
+def grade_submission(task_dir: str, name: str, source: str, timeout: float) -> SubmissionResult:
+    start = time.monotonic()
+    with tempfile.TemporaryDirectory(prefix="grade_") as workspace:
+        try:
+            task_copy = prepare_workspace(task_dir, source, workspace)
+            returncode, output = run_autograder(task_copy, timeout)
+            results = load_results(os.path.join(task_copy, RESULTS_NAME))
+        except Exception as e:
+            return SubmissionResult(name, "error", duration=time.monotonic() - start, output=str(e))
+
+    # 超时或评测进程崩溃时没有 JSON 结果，从输出中解析已经完成的测试项
+    passed, failed, parts = results if results is not None else parse_output(output)
+    if returncode is None:
+        status = "timeout"
+    elif returncode == 0:
+        status = "passed"
+    elif parts or passed or failed:
+        status = "failed"
+    else:
+        status = "error"
+
+    return SubmissionResult(
+        submission=name,
+        status=status,
+        passed=passed,
+        failed=failed,
+        duration=time.monotonic() - start,
+        returncode=returncode,
+        parts=parts,
+        output=ANSI_ESCAPE.sub("", output)[-4000:],
+    )
+
+
+# ==============================================================================
+# 报告
+# ==============================================================================
+
+def write_json_report(path: str, task_dir: str, jobs: int, duration: float,
+                      results: List[SubmissionResult]) -> None:
+    summary = {"total": len(results)}
+    for status in ("passed", "failed", "timeout", "error"):
+        summary[status] = sum(1 for r in results if r.status == status)
+
+    report = {
+        "task": os.path.basename(os.path.normpath(task_dir)),
+        "jobs": jobs,
+        "duration": round(duration, 3),
+        "summary": summary,
+        "results": [asdict(r) for r in results],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def write_csv_report(path: str, results: List[SubmissionResult]) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["submission", "status", "passed", "failed", "duration", "returncode"])
+        for r in results:
+            writer.writerow([r.submission, r.status, r.passed, r.failed, f"{r.duration:.3f}", r.returncode])
+
+
+# ==============================================================================
+# 主入口
+# ==============================================================================
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="并行评测多份学生提交")
+    parser.add_argument("task_dir", help="题目目录，例如 tasks/task1")
+    parser.add_argument("submissions_dir", help="提交目录，每个子目录或 .cpp 文件是一份提交")
+    parser.add_argument("-j", "--jobs", type=int, default=default_jobs(), help="同时评测的提交数量，默认为 CPU 数量")
+    parser.add_argument("--timeout", type=float, default=300, help="每份提交的评测超时时间（秒）")
+    parser.add_argument("--report", default="grade_report.json", help="JSON 报告路径")
+    parser.add_argument("--csv", default=None, help="CSV 报告路径")
+    args = parser.parse_args()
+
+    # 准备虚拟环境和测试依赖，之后启动的评测进程共用这个环境
+    utils.bootstrap()
+
+    submissions = find_submissions(args.submissions_dir)
+    if not submissions:
+        print(f"在 {args.submissions_dir} 中没有找到提交")
+        return 1
+
+    task_dir = os.path.abspath(args.task_dir)
+    jobs = max(1, args.jobs)
+    print(f"🧪 评测 {len(submissions)} 份提交, 并行数 {jobs}")
+
+    start = time.monotonic()
+    results = []
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(grade_submission, task_dir, name, source, args.timeout)
+                   for name, source in submissions]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"[{len(results)}/{len(submissions)}] {result.submission}: {result.status} "
+                  f"({result.passed} 通过, {result.failed} 失败, {result.duration:.1f}s)")
+    duration = time.monotonic() - start
+
+    results.sort(key=lambda r: r.submission)
+    write_json_report(args.report, task_dir, jobs, duration, results)
+    if args.csv:
+        write_csv_report(args.csv, results)
+
+    passed = sum(1 for r in results if r.status == "passed")
+    print(f"\n{'='*60}")
+    print(f"评测完成: {passed}/{len(results)} 份提交全部通过, 用时 {duration:.1f}s")
+    print(f"报告: {args.report}" + (f", {args.csv}" if args.csv else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
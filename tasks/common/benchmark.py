@@ -0,0 +1,181 @@
+"""
+性能基准测试 - 统计分析和基线比较
+
+基准测试程序每行输出一个 JSON 结果:
+    {"name": "submit_enqueue", "unit": "ns/op", "iterations": 10000, "samples": [...]}
+
+每个基准测试取剔除离群值之后的中位数，和保存的基线比较，
+中位数变慢超过阈值并且超出测量噪声时视为性能回退。
+"""
+
+import os
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils import ResourceLimits, run_limited
+
+# 修正 MAD 使其在正态分布下和标准差一致
+MAD_SCALE = 1.4826
+# 修正 z-score 超过这个值的样本视为离群值
+OUTLIER_THRESHOLD = 3.5
+# 中位数变慢超过 15% 视为回退（同一台机器上两次运行之间的差异通常在 10% 左右）
+DEFAULT_THRESHOLD = 0.15
+
+# 基准测试需要的 CPU 时间比普通测试长
+BENCHMARK_LIMITS = ResourceLimits(cpu_seconds=300)
+
+
+# ==============================================================================
+# 统计
+# ==============================================================================
+
+def median(values: Sequence[float]) -> float:
+    ordered = sorted(values)
+    n = len(ordered)
+    if n == 0:
+        raise ValueError("没有样本")
+    mid = n // 2
+    return ordered[mid] if n % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def mad(values: Sequence[float]) -> float:
+    """中位数绝对偏差 (median absolute deviation)"""
+    center = median(values)
+    return median([abs(v - center) for v in values])
+
+
+def reject_outliers(values: Sequence[float], threshold: float = OUTLIER_THRESHOLD) -> Tuple[List[float], List[float]]:
+    """按修正 z-score 剔除离群值，返回 (保留的样本, 剔除的样本)"""
+    center = median(values)
+    spread = mad(values) * MAD_SCALE
+    if spread == 0:
+        return list(values), []
+    kept = [v for v in values if abs(v - center) / spread <= threshold]
+    rejected = [v for v in values if abs(v - center) / spread > threshold]
+    return kept, rejected
+
+
+@dataclass
+class BenchmarkStats:
+    name: str
+    unit: str
+    median: float
+    mad: float
+    minimum: float
+    samples: int
+    rejected: int = 0
+
+
+def summarize(name: str, unit: str, samples: Sequence[float]) -> BenchmarkStats:
+    kept, rejected = reject_outliers(samples)
+    return BenchmarkStats(name, unit, median(kept), mad(kept), min(kept), len(kept), len(rejected))
+
+
+def parse_output(output: str) -> List[BenchmarkStats]:
+    """解析基准测试程序的输出，忽略不是 JSON 的行"""
+    import json
+    stats = []
+    for line in output.splitlines():
+        line = line.strip()
+        if not line.startswith("{"):
+            continue
+        data = json.loads(line)
+        stats.append(summarize(data["name"], data.get("unit", ""), data["samples"]))
+    return stats
+
+
+# ==============================================================================
+# 基线
+# ==============================================================================
+
+def load_baseline(path: str) -> Dict[str, BenchmarkStats]:
+    import json
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {name: BenchmarkStats(**item) for name, item in data.items()}
+
+
+def save_baseline(path: str, stats: List[BenchmarkStats]) -> None:
+    """更新基线文件中对应的基准测试，保留其它基准测试的基线"""
+    import json
+    baseline = load_baseline(path)
+    for s in stats:
+        baseline[s.name] = s
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({name: asdict(s) for name, s in sorted(baseline.items())}, f, ensure_ascii=False, indent=2)
+
+
+@dataclass
+class Comparison:
+    current: BenchmarkStats
+    baseline: Optional[BenchmarkStats]
+    change: Optional[float]  # 中位数的相对变化，正数表示变慢
+    regression: bool
+
+
+def compare(current: List[BenchmarkStats], baseline: Dict[str, BenchmarkStats],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Comparison]:
+    comparisons = []
+    for s in current:
+        base = baseline.get(s.name)
+        if base is None or base.median <= 0:
+            comparisons.append(Comparison(s, base, None, False))
+            continue
+        change = s.median / base.median - 1
+        # 差值还要超出两次测量的噪声，避免把抖动当成回退
+        noise = 3 * MAD_SCALE * max(s.mad, base.mad)
+        regression = change > threshold and s.median - base.median > noise
+        comparisons.append(Comparison(s, base, change, regression))
+    return comparisons
+
+
+def format_report(comparisons: List[Comparison]) -> str:
+    lines = [f"{'基准测试':<24}{'中位数':>14}{'MAD':>12}{'基线':>14}{'变化':>10}"]
+    for c in comparisons:
+        s = c.current
+        base = f"{c.baseline.median:.1f}" if c.baseline else "-"
+        change = f"{c.change:+.1%}" if c.change is not None else "-"
+        mark = "  ⚠ 回退" if c.regression else ""
+        lines.append(f"{s.name:<28}{s.median:>12.1f} {s.unit:<6}{s.mad:>8.1f}{base:>14}{change:>10}{mark}")
+        if s.rejected:
+            lines.append(f"    剔除 {s.rejected} 个离群样本")
+    return "\n".join(lines)
+
+
+# ==============================================================================
+# Autograder 集成
+# ==============================================================================
+
+def benchmark_part(args: Sequence[str], baseline_path: str, threshold: float = DEFAULT_THRESHOLD,
+                   timeout: float = 300, cwd: Optional[str] = None) -> Callable[[bool], bool]:
+    """创建一个基准测试项，用 Autograder.add_benchmark 注册
+
+    没有基线或者指定 --update-baseline 时把本次结果保存为基线，
+    否则任何基准测试的中位数回退超过阈值都会使测试项失败。
+    """
+    def run(update_baseline: bool) -> bool:
+        output, returncode = run_limited(args, timeout=timeout, cwd=cwd, limits=BENCHMARK_LIMITS)
+        if returncode != 0:
+            raise AssertionError(f"基准测试运行失败 (返回码 {returncode}):\n{output}")
+        stats = parse_output(output)
+        if not stats:
+            raise AssertionError(f"基准测试没有输出结果:\n{output}")
+
+        baseline = load_baseline(baseline_path)
+        comparisons = compare(stats, baseline, threshold)
+        print(format_report(comparisons))
+
+        if update_baseline or not any(c.baseline for c in comparisons):
+            save_baseline(baseline_path, stats)
+            print(f"已保存基线: {baseline_path}")
+            return True
+
+        regressions = [c for c in comparisons if c.regression]
+        if regressions:
+            names = ", ".join(f"{c.current.name} ({c.change:+.1%})" for c in regressions)
+            raise AssertionError(f"性能回退超过 {threshold:.0%}: {names}")
+        return True
+
+    return run
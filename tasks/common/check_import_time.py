@@ -0,0 +1,78 @@
+"""
+检查导入自动测试模块的耗时
+
+用法:
+    python tasks/common/check_import_time.py --budget-ms 50
+
+用 `python -X importtime` 在新的解释器中导入 utils 模块，
+累计耗时超过预算，或者导入时加载了只应在运行时才需要的模块（例如 colorama、subprocess），
+则返回非 0。
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import List, Tuple
+
+COMMON_DIR = os.path.dirname(os.path.abspath(__file__))
+MODULE = "utils"
+
+# 导入 utils 时不应该加载的模块
+LAZY_MODULES = ["colorama", "subprocess", "argparse", "xml.etree.ElementTree", "hashlib", "json"]
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure() -> List[Tuple[str, int, int]]:
+    """返回 (模块名, 自身耗时 us, 累计耗时 us) 列表，只包含导入 utils 时新加载的模块"""
+    env = os.environ.copy()
+    env.pop("PYTHONSTARTUP", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        cwd=COMMON_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+
+    # -X importtime 按导入完成的顺序输出，utils 自身在它所有依赖之后
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3))))
+
+    index = next(i for i, m in enumerate(modules) if m[0] == MODULE and m[3] == 1)
+    start = index
+    while start > 0 and modules[start - 1][3] > 1:
+        start -= 1
+    return [(name, self_us, cumulative_us) for name, self_us, cumulative_us, _ in modules[start:index + 1]]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="检查导入自动测试模块的耗时")
+    parser.add_argument("--budget-ms", type=float, default=50, help="导入耗时预算（毫秒）")
+    parser.add_argument("--repeat", type=int, default=5, help="测量次数，取最小值以减少噪声")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(max(1, args.repeat))]
+    best = min(runs, key=lambda modules: modules[-1][2])
+    total_ms = best[-1][2] / 1000
+
+    print(f"导入 {MODULE}: {total_ms:.1f} ms (预算 {args.budget_ms:.1f} ms)")
+    for name, self_us, _ in sorted(best, key=lambda m: m[1], reverse=True)[:5]:
+        print(f"    {name:<30} {self_us / 1000:6.1f} ms")
+
+    loaded = {name for name, _, _ in best}
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    if eager:
+        print(f"❌ 导入时加载了应延迟导入的模块: {', '.join(eager)}")
+        return 1
+    if total_ms > args.budget_ms:
+        print("❌ 超出导入耗时预算")
+        return 1
+    print("✅ 导入耗时在预算内")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
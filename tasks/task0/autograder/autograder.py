@@ -2,7 +2,7 @@
 Task 0: 多线程基础 - 自动测试
 """
 
-from utils import Autograder, ASSIGNMENT_DIR
+from utils import Autograder, ASSIGNMENT_DIR, run_limited
 
 import os
 import subprocess
@@ -245,15 +245,8 @@ def cleanup_test_environment():
 
 
 def run_test_binary(test_name: str, timeout: int = 30) -> tuple:
-    """运行测试二进制文件并返回输出"""
-    result = subprocess.run(
-        [EXECUTABLE, test_name],
-        capture_output=True,
-        text=True,
-        timeout=timeout,
-        cwd=ASSIGNMENT_DIR
-    )
-    return result.stdout + result.stderr, result.returncode
+    """在资源限制下运行测试二进制文件并返回输出"""
+    return run_limited([EXECUTABLE, test_name], timeout=timeout, cwd=ASSIGNMENT_DIR)
 
 
 # ==============================================================================
@@ -292,6 +285,7 @@ if __name__ == "__main__":
     grader = Autograder()
     grader.setup = setup_test_environment
     grader.teardown = cleanup_test_environment
+    grader.add_inputs([SOURCE_FILE], [TEST_CODE])
 
     grader.add_part("练习 1: 创建多个线程 (create_threads)", test_create_threads)
     grader.add_part("练习 2: 参数传递 (compute_sum)", test_compute_sum)
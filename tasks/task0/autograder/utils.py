@@ -15,6 +15,10 @@ def _check_virtualenv():
     import os
     import subprocess
 
+    # 批量评测时由调用方准备好环境，不在每份提交的临时目录里创建虚拟环境
+    if os.environ.get("AUTOGRADER_NO_BOOTSTRAP"):
+        return
+
     venv_path = os.path.dirname(os.path.abspath(__file__))
 
     if os.environ.get("VIRTUAL_ENV", None) != venv_path or "VIRTUAL_ENV_BIN" not in os.environ:
@@ -40,8 +44,6 @@ def _check_virtualenv():
         result = subprocess.run([interpreter_path] + sys.argv, env=env)
         sys.exit(result.returncode)
 
-_check_virtualenv()
-
 
 # ==============================================================================
 # Pip Package Installation
@@ -61,6 +63,9 @@ def _install_requirements():
     import subprocess
     import os
 
+    if os.environ.get("AUTOGRADER_NO_BOOTSTRAP"):
+        return
+
     print("⏳ 安装测试依赖...")
 
     subprocess.check_call([sys.executable, "-m", "ensurepip", "--default-pip"],
@@ -79,20 +84,204 @@ def _install_requirements():
 
     print("✅ 依赖安装完成")
 
-_install_requirements()
+
+def bootstrap():
+    """准备虚拟环境和测试依赖，必要时在虚拟环境中重新启动当前脚本
+
+    只在命令行入口调用，导入本模块本身没有副作用，也不会启动子进程。
+    """
+    _check_virtualenv()
+    _install_requirements()
 
 
 # ==============================================================================
 # Imports
 # ==============================================================================
 
+# 只在模块级别导入轻量的模块，subprocess、argparse 等在用到时才导入，
+# 保证导入 Autograder 只需要几毫秒
 import os
-import subprocess
-from dataclasses import dataclass
-from typing import Callable, List, Optional, Union
-from colorama import Fore, init, Style, Back
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ==============================================================================
+# Terminal Colors
+# ==============================================================================
+
+class _PlainFore:
+    RED = "\x1b[31m"
+    GREEN = "\x1b[32m"
+    YELLOW = "\x1b[33m"
+    LIGHTWHITE_EX = "\x1b[97m"
+    RESET = "\x1b[39m"
+
+class _PlainBack:
+    CYAN = "\x1b[46m"
+    LIGHTGREEN_EX = "\x1b[102m"
+    RESET = "\x1b[49m"
+
+class _PlainStyle:
+    BRIGHT = "\x1b[1m"
+    DIM = "\x1b[2m"
+    NORMAL = "\x1b[22m"
+    RESET_ALL = "\x1b[0m"
+
+_colors = None
+
+def _load_colors():
+    """第一次输出时才加载 colorama，没有安装 colorama 时直接使用 ANSI 转义序列"""
+    global _colors
+    if _colors is None:
+        try:
+            from colorama import Fore, Back, Style, init
+            init()
+            _colors = (Fore, Back, Style)
+        except ImportError:
+            _colors = (_PlainFore, _PlainBack, _PlainStyle)
+    return _colors
+
+# ==============================================================================
+# Sandboxed Execution
+# ==============================================================================
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    cpu_seconds: int = 30
+    address_space: int = 2 * 1024 ** 3  # 字节
+    # 在当前用户已有的进程和线程数之上最多还能创建多少个。RLIMIT_NPROC 统计的是 real UID 的所有进程和线程，
+    # 不是测试程序自己的，所以上限按运行时的数量计算，桌面会话或者批量评测并行运行时不会误伤正常的提交
+    max_processes: int = 256
+    open_files: int = 256
+
+
+@dataclass(frozen=True)
+class ResourceUsage:
+    user_time: float  # 秒
+    system_time: float  # 秒
+    max_rss_kb: int
+    voluntary_switches: int
+    involuntary_switches: int
+
+
+DEFAULT_LIMITS = ResourceLimits()
+
+# 当前测试项中运行的测试程序的资源使用情况，由 Autograder 在每个测试项结束后输出
+_part_usages: List[ResourceUsage] = []
+
+
+def _user_task_count() -> Optional[int]:
+    """当前用户（real UID）的进程和线程总数，也就是 RLIMIT_NPROC 统计的数量，没有 /proc 时返回 None"""
+    if not os.path.isdir("/proc"):
+        return None
+    uid = os.getuid()
+    count = 0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        owner = threads = None
+        try:
+            with open(os.path.join("/proc", pid, "status"), "r", encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    if line.startswith("Uid:"):
+                        owner = int(line.split()[1])
+                    elif line.startswith("Threads:"):
+                        threads = int(line.split()[1])
+        except (OSError, ValueError, IndexError):
+            continue  # 进程已经退出
+        if owner == uid:
+            count += threads or 1
+    return count
+
+
+def _apply_limits(limits: ResourceLimits, max_processes: Optional[int]) -> None:
+    """在子进程 exec 之前设置资源上限，max_processes 为 None 时不限制进程数"""
+    rlimits = [(resource.RLIMIT_CPU, limits.cpu_seconds),
+               (resource.RLIMIT_AS, limits.address_space),
+               (resource.RLIMIT_NOFILE, limits.open_files)]
+    if max_processes is not None:
+        rlimits.append((resource.RLIMIT_NPROC, max_processes))
+    for name, value in rlimits:
+        _, hard = resource.getrlimit(name)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        resource.setrlimit(name, (value, hard))
+
+
+def run_limited(args: Sequence[str], timeout: float, cwd: Optional[str] = None,
+                limits: ResourceLimits = DEFAULT_LIMITS) -> Tuple[str, int]:
+    """在资源限制下运行程序，返回 (stdout + stderr, 返回码)，超时抛出 subprocess.TimeoutExpired"""
+    import subprocess
+    import tempfile
+    import threading
+
+    if resource is None or not hasattr(os, "wait4"):
+        result = subprocess.run(args, capture_output=True, text=True, timeout=timeout, cwd=cwd)
+        return result.stdout + result.stderr, result.returncode
+
+    # 进程数上限要在 fork 之前按当前用户已有的数量算好，preexec_fn 中只调用 setrlimit
+    current = _user_task_count()
+    max_processes = current + limits.max_processes if current is not None else None
+
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        process = subprocess.Popen(args, stdout=out, stderr=err, cwd=cwd,
+                                   preexec_fn=lambda: _apply_limits(limits, max_processes))
+
+        # 超时由定时器结束进程，主线程用 wait4 等待以拿到子进程的 rusage
+        lock = threading.Lock()
+        state = {"finished": False, "timed_out": False}
+
+        def kill():
+            with lock:
+                if not state["finished"]:
+                    state["timed_out"] = True
+                    process.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            _, status, usage = os.wait4(process.pid, 0)
+        finally:
+            with lock:
+                state["finished"] = True
+            timer.cancel()
+        process.returncode = os.waitstatus_to_exitcode(status)
+
+        # Linux 上 ru_maxrss 的单位是 KB，macOS 上是字节
+        max_rss = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+        _part_usages.append(ResourceUsage(usage.ru_utime, usage.ru_stime, max_rss,
+                                          usage.ru_nvcsw, usage.ru_nivcsw))
+
+        out.seek(0)
+        err.seek(0)
+        output = out.read().decode("utf-8", errors="replace") + err.read().decode("utf-8", errors="replace")
+
+    if state["timed_out"]:
+        raise subprocess.TimeoutExpired(args, timeout, output=output)
+    return output, process.returncode
+
+
+def _aggregate_usage(usages: List[ResourceUsage]) -> ResourceUsage:
+    """合并一个测试项中多次运行的资源使用: 时间和切换次数累加，内存取最大值"""
+    return ResourceUsage(
+        user_time=sum(u.user_time for u in usages),
+        system_time=sum(u.system_time for u in usages),
+        max_rss_kb=max(u.max_rss_kb for u in usages),
+        voluntary_switches=sum(u.voluntary_switches for u in usages),
+        involuntary_switches=sum(u.involuntary_switches for u in usages),
+    )
 
-init()
+
+def _format_usage(usage: ResourceUsage) -> str:
+    return (f"⏱  CPU {usage.user_time:.2f}s 用户 + {usage.system_time:.2f}s 系统, "
+            f"最大内存 {usage.max_rss_kb / 1024:.1f} MB, "
+            f"上下文切换 {usage.voluntary_switches} 主动 / {usage.involuntary_switches} 被动")
 
 # ==============================================================================
 # Autograder Core
@@ -108,25 +297,159 @@ class TestPart:
     name: str
     func: TestFunction
     special: bool = False
+    benchmark: bool = False  # 基准测试项，只在指定 --benchmark 时运行
+
+@dataclass
+class PartResult:
+    name: str
+    status: str  # passed / failed
+    duration: float = 0.0
+    message: str = ""
+    usage: Optional[ResourceUsage] = None
+    inputs_hash: str = ""
+    cached: bool = False  # 本次没有运行，沿用上一次的结果
+
+
+def _hash_inputs(files: List[str], templates: List[str]) -> str:
+    """计算测试输入（学生代码和测试模板）的 hash"""
+    import hashlib
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(path.encode("utf-8"))
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    for template in templates:
+        digest.update(template.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _load_results(path: str) -> Dict[str, PartResult]:
+    import json
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    results = {}
+    for item in data.get("parts", []):
+        usage = ResourceUsage(**item["usage"]) if item.get("usage") else None
+        results[item["name"]] = PartResult(item["name"], item["status"], item.get("duration", 0.0),
+                                           item.get("message", ""), usage, item.get("inputs_hash", ""))
+    return results
+
+
+def _write_json(path: str, suite: str, duration: float, results: List[PartResult]) -> None:
+    import json
+    data = {
+        "suite": suite,
+        "duration": round(duration, 6),
+        "passed": sum(1 for r in results if r.status == "passed"),
+        "failed": sum(1 for r in results if r.status == "failed"),
+        "cached": sum(1 for r in results if r.cached),
+        "parts": [asdict(r) for r in results],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _write_junit(path: str, suite: str, duration: float, results: List[PartResult]) -> None:
+    import xml.etree.ElementTree as ET
+    testsuite = ET.Element("testsuite", {
+        "name": suite,
+        "tests": str(len(results)),
+        "failures": str(sum(1 for r in results if r.status == "failed")),
+        "time": f"{duration:.6f}",
+    })
+    for r in results:
+        testcase = ET.SubElement(testsuite, "testcase", {
+            "classname": suite, "name": r.name, "time": f"{r.duration:.6f}",
+        })
+        if r.status == "failed":
+            failure = ET.SubElement(testcase, "failure", {"message": r.message.splitlines()[0] if r.message else ""})
+            failure.text = r.message
+        properties = ET.SubElement(testcase, "properties")
+        ET.SubElement(properties, "property", {"name": "cached", "value": str(r.cached).lower()})
+        if r.usage:
+            for key, value in asdict(r.usage).items():
+                ET.SubElement(properties, "property", {"name": key, "value": str(value)})
+    testsuites = ET.Element("testsuites")
+    testsuites.append(testsuite)
+    ET.ElementTree(testsuites).write(path, encoding="utf-8", xml_declaration=True)
+
 
 class Autograder:
-    def __init__(self):
+    def __init__(self, name: Optional[str] = None):
         self.parts: List[TestPart] = []
         self.setup: Optional[TestFunction] = None
         self.teardown: Optional[TestFunction] = None
+        # 测试的输入，整个测试套件共用一个hash，用于 --changed-only 判断是否需要重新运行
+        self.input_files: List[str] = []
+        self.input_templates: List[str] = []
+        self.name = name or os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(sys.argv[0]))))
+        self.update_baseline = False
 
     def add_part(self, name: str, func: Callable[[], bool]) -> None:
         self.parts.append(TestPart(name, func))
 
-    def run(self) -> int:
-        parts = self.parts.copy()
-        if self.setup:
-            parts.insert(0, TestPart("测试环境准备", self.setup, True))
-        if self.teardown:
-            parts.append(TestPart("测试环境清理", self.teardown, True))
+    def add_benchmark(self, name: str, func: Callable[[bool], bool]) -> None:
+        """注册基准测试项，func 的参数表示是否把本次结果保存为基线"""
+        self.parts.append(TestPart(name, lambda: func(self.update_baseline), benchmark=True))
+
+    def add_inputs(self, files: List[str], templates: List[str] = ()) -> None:
+        self.input_files.extend(files)
+        self.input_templates.extend(templates)
+
+    def _parse_args(self, argv: Optional[List[str]]) -> "argparse.Namespace":
+        import argparse
+        parser = argparse.ArgumentParser(description=f"{self.name} 自动测试")
+        parser.add_argument("--json", metavar="PATH",
+                            help="以 JSON 格式写入测试结果，默认为 autograder/results.json")
+        parser.add_argument("--junit", metavar="PATH", help="以 JUnit XML 格式写入测试结果")
+        parser.add_argument("--rerun-failed", action="store_true", help="只运行上一次失败的测试项")
+        parser.add_argument("--changed-only", action="store_true", help="输入没有变化时沿用上一次的结果，任何输入变化都重新运行所有测试项")
+        parser.add_argument("--benchmark", action="store_true", help="同时运行基准测试项")
+        parser.add_argument("--update-baseline", action="store_true", help="把基准测试结果保存为新的基线")
+        args = parser.parse_args(argv)
+        if not args.json:
+            # 每次运行都写入结果，之后的增量运行才能读取上一次的结果，默认放在 autograder 目录下
+            args.json = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), "results.json")
+        return args
+
+    def run(self, argv: Optional[List[str]] = None) -> int:
+        # 先解析参数，--help 不需要准备环境
+        args = self._parse_args(argv)
+        bootstrap()
+        Fore, Back, Style = _load_colors()
+        inputs_hash = _hash_inputs(self.input_files, self.input_templates)
+        self.update_baseline = args.update_baseline
+        selected = [p for p in self.parts if args.benchmark or not p.benchmark]
+
+        # 增量运行: 沿用上一次输入没有变化的测试项的结果，--rerun-failed 时只沿用通过的测试项
+        # 输入变化的测试项无论指定哪个参数都要重新运行
+        previous = _load_results(args.json) if (args.rerun_failed or args.changed_only) else {}
+        cached: Dict[str, PartResult] = {}
+        for part in selected:
+            last = previous.get(part.name)
+            if last is None:
+                continue
+            failed = last.status != "passed"
+            changed = last.inputs_hash != inputs_hash
+            if changed or (args.rerun_failed and failed):
+                continue
+            last.cached = True
+            cached[part.name] = last
+
+        parts = [p for p in selected if p.name not in cached]
+        if parts:
+            if self.setup:
+                parts.insert(0, TestPart("测试环境准备", self.setup, True))
+            if self.teardown:
+                parts.append(TestPart("测试环境清理", self.teardown, True))
 
         failures = 0
         passed = 0
+        results: Dict[str, PartResult] = dict(cached)
+        start = time.perf_counter()
 
         for part in parts:
             header = f"🧪 测试: {part.name}".ljust(60)
@@ -134,6 +457,8 @@ class Autograder:
 
             result = None
             error = None
+            _part_usages.clear()
+            part_start = time.perf_counter()
 
             try:
                 result = part.func()
@@ -141,6 +466,8 @@ class Autograder:
                 error = e
                 result = False
 
+            part_result = PartResult(part.name, "passed", time.perf_counter() - part_start,
+                                     inputs_hash=inputs_hash)
             if result is None or result:
                 if not part.special:
                     print(f"{Fore.GREEN}✅ {part.name} 通过!{Fore.RESET}")
@@ -150,9 +477,37 @@ class Autograder:
                 if error:
                     print(f"{Style.BRIGHT}原因:{Style.DIM} {error}{Style.RESET_ALL}")
                 failures += 1
+                part_result.status = "failed"
+                part_result.message = str(error) if error else ""
+
+            if _part_usages:
+                part_result.usage = _aggregate_usage(_part_usages)
+                print(f"{Style.DIM}{_format_usage(part_result.usage)}{Style.RESET_ALL}")
+
+            if not part.special:
+                results[part.name] = part_result
+            elif part_result.status == "failed":
+                # 测试环境准备失败，没有运行的测试项都记为失败
+                for other in selected:
+                    if other.name not in results:
+                        results[other.name] = PartResult(other.name, "failed",
+                                                         message=f"{part.name}失败: {part_result.message}",
+                                                         inputs_hash=inputs_hash)
+                break
+
+        for name, last in cached.items():
+            status = "通过" if last.status == "passed" else "失败"
+            print(f"{Style.DIM}⏭  {name} 跳过 (沿用上一次的结果: {status}){Style.RESET_ALL}")
+            if last.status == "passed":
+                passed += 1
+            else:
+                failures += 1
 
-                if part.special:
-                    break
+        duration = time.perf_counter() - start
+        ordered = [results[p.name] for p in selected if p.name in results]
+        _write_json(args.json, self.name, duration, ordered)
+        if args.junit:
+            _write_junit(args.junit, self.name, duration, ordered)
 
         # Summary
         total = passed + failures
@@ -7,7 +7,8 @@ import os
 
 # 引用公共模块
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'common'))
-from utils import Autograder
+from utils import Autograder, run_limited
+from benchmark import benchmark_part
 
 import subprocess
 import re
@@ -21,6 +22,7 @@ import time
 ASSIGNMENT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 EXECUTABLE = os.path.join(ASSIGNMENT_DIR, "student_code")
 SOURCE_FILE = os.path.join(ASSIGNMENT_DIR, "main.cpp")
+BASELINE_FILE = os.path.join(ASSIGNMENT_DIR, "autograder", "benchmark_baseline.json")
 
 
 # ==============================================================================
@@ -199,6 +201,44 @@ int test_id_passed_correctly() {
     }
 }
 
+// ==============================================================================
+// 基准测试: Thread::start 的创建开销
+// ==============================================================================
+
+int bench_spawn() {
+    const int samples = 15;
+    const int iterations = 50;
+
+    std::cout << "{\\"name\\": \\"thread_spawn\\", \\"unit\\": \\"ns/op\\", \\"iterations\\": " << iterations
+              << ", \\"samples\\": [";
+    for (int s = 0; s < samples; ++s) {
+        // 和上面的测试一样保存指针，不要求学生的 Thread 可以拷贝或移动
+        std::atomic<int> started{0};
+        std::vector<Thread*> threads;
+        for (int i = 0; i < iterations; ++i) {
+            threads.push_back(new Thread([&started](int id) { started++; }));
+        }
+
+        // 从调用 start 到所有线程函数开始执行
+        auto begin = std::chrono::steady_clock::now();
+        for (auto* t : threads) {
+            t->start();
+        }
+        while (started < iterations) {
+            std::this_thread::yield();
+        }
+        auto elapsed = std::chrono::duration<double, std::nano>(std::chrono::steady_clock::now() - begin);
+
+        std::cout << (s ? ", " : "") << elapsed.count() / iterations;
+        std::this_thread::sleep_for(std::chrono::milliseconds(5));
+        for (auto* t : threads) {
+            delete t;
+        }
+    }
+    std::cout << "]}" << std::endl;
+    return 0;
+}
+
 // ==============================================================================
 // 主函数 - 运行指定测试
 // ==============================================================================
@@ -219,6 +259,8 @@ int main(int argc, char* argv[]) {
         return test_function_types();
     } else if (test_name == "id_passed_correctly") {
         return test_id_passed_correctly();
+    } else if (test_name == "bench_spawn") {
+        return bench_spawn();
     } else {
         std::cerr << "Unknown test: " << test_name << std::endl;
         return 1;
@@ -289,15 +331,8 @@ def cleanup_test_environment():
 
 
 def run_test_binary(test_name: str, timeout: int = 30) -> tuple:
-    """运行测试二进制文件并返回输出"""
-    result = subprocess.run(
-        [EXECUTABLE, test_name],
-        capture_output=True,
-        text=True,
-        timeout=timeout,
-        cwd=ASSIGNMENT_DIR
-    )
-    return result.stdout + result.stderr, result.returncode
+    """在资源限制下运行测试二进制文件并返回输出"""
+    return run_limited([EXECUTABLE, test_name], timeout=timeout, cwd=ASSIGNMENT_DIR)
 
 
 # ==============================================================================
@@ -348,10 +383,12 @@ if __name__ == "__main__":
     grader = Autograder()
     grader.setup = setup_test_environment
     grader.teardown = cleanup_test_environment
+    grader.add_inputs([SOURCE_FILE], [TEST_CODE])
 
     grader.add_part("练习 1: 基本线程创建和执行", test_basic_creation)
     grader.add_part("练习 2: 多线程唯一 ID", test_unique_ids)
     grader.add_part("练习 3: 支持不同函数类型", test_function_types)
     grader.add_part("练习 4: 线程 ID 正确传递", test_id_passed_correctly)
+    grader.add_benchmark("基准测试: Thread::start 创建开销", benchmark_part([EXECUTABLE, "bench_spawn"], BASELINE_FILE))
 
     exit(grader.run())
@@ -0,0 +1,84 @@
+"""
+线程池功能测试
+
+用法:
+    python tests/run_tests.py                   # 编译并运行所有测试
+    python tests/run_tests.py --rerun-failed    # 只运行上一次失败的测试项
+
+每个测试项运行 threadpool_test 中名称以指定前缀开头的测试。
+"""
+
+import sys
+import os
+
+# 引用公共模块
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tasks', 'common'))
+from utils import Autograder, run_limited
+
+import subprocess
+
+# ==============================================================================
+# 配置
+# ==============================================================================
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+SOURCE_FILE = os.path.join(TEST_DIR, "threadpool_test.cpp")
+HEADER_FILE = os.path.join(ROOT_DIR, "threadpool.h")
+EXECUTABLE = os.path.join(TEST_DIR, "threadpool_test")
+
+
+# ==============================================================================
+# 测试环境
+# ==============================================================================
+
+def build_tests():
+    result = subprocess.run(
+        ["g++", "-std=c++14", "-O2", "-pthread", "-o", EXECUTABLE, SOURCE_FILE],
+        capture_output=True,
+        text=True,
+        cwd=TEST_DIR
+    )
+    if result.returncode != 0:
+        raise AssertionError(f"编译失败:\n{result.stderr}")
+    return True
+
+
+def cleanup_tests():
+    if os.path.exists(EXECUTABLE):
+        os.remove(EXECUTABLE)
+    return True
+
+
+def test(prefix: str, timeout: float = 60):
+    def run():
+        output, returncode = run_limited([EXECUTABLE, "--filter", prefix], timeout=timeout, cwd=TEST_DIR)
+        print(output.rstrip())
+        if returncode != 0:
+            raise AssertionError(f"测试失败 (返回码 {returncode})")
+        return True
+    return run
+
+
+# ==============================================================================
+# 主入口
+# ==============================================================================
+
+if __name__ == "__main__":
+    grader = Autograder("tests")
+    grader.setup = build_tests
+    grader.teardown = cleanup_tests
+    grader.add_inputs([SOURCE_FILE, HEADER_FILE])
+
+    grader.add_part("幂等任务结果缓存: TTL 不影响执行中的任务 (submitMemoTask)", test("memo_"))
+    grader.add_part("工作线程暂存区: 地址对齐 (ScratchArena)", test("arena_"))
+    grader.add_part("工作线程上下文: currentWorker、用户数据和启动/退出回调", test("worker_"))
+    grader.add_part("取消令牌: 截止时间自动取消队列中的任务 (submitCancellableTask)", test("cancel_"))
+    grader.add_part("熔断: 试探任务没有结果时可以恢复 (setCircuitBreaker)", test("circuit_"))
+    grader.add_part("时间轮: cascade、取消和固定频率 (TimerWheel)", test("timer_"))
+    grader.add_part("分片任务队列: 不丢失唤醒 (setTaskQueShards)", test("shard_"))
+    grader.add_part("嵌套并行: 单线程递归不死锁 (TaskGroup)", test("taskgroup_"))
+    grader.add_part("自适应线程数量 (setAdaptiveSizing)", test("adaptive_"))
+    grader.add_part("任务参数: 只能移动的参数和函数对象，不拷贝参数", test("move_"))
+
+    exit(grader.run())
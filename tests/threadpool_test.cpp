@@ -0,0 +1,890 @@
+// threadpool_test.cpp : 线程池的功能测试
+//
+// 用法: threadpool_test [--filter 名称前缀]
+// 每个测试输出一行 PASS / FAIL，有测试失败或者没有匹配的测试时返回码为 1，由 tests/run_tests.py 运行
+
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <vector>
+#include <atomic>
+#include <thread>
+#include <future>
+#include <functional>
+#include <chrono>
+#include <climits>
+#include <memory>
+#include <algorithm>
+#include <mutex>
+#include <stdexcept>
+#include "../threadpool.h"
+
+using namespace std;
+
+// 检查条件，不满足时抛出异常结束当前测试
+#define CHECK(cond) \
+    do { \
+        if (!(cond)) { \
+            ostringstream out_; \
+            out_ << __FILE__ << ":" << __LINE__ << ": CHECK(" #cond ") failed"; \
+            throw runtime_error(out_.str()); \
+        } \
+    } while (0)
+
+struct Options
+{
+    string filter;
+    ostream* out = &cout;
+    int passed = 0;
+    int failed = 0;
+};
+
+// 丢弃所有输出的缓冲区
+struct NullBuffer : streambuf
+{
+    int overflow(int c) override { return c; }
+};
+
+void runTest(Options& options, const string& name, void (*test)())
+{
+    if (name.compare(0, options.filter.size(), options.filter) != 0)
+        return;
+
+    try
+    {
+        test();
+        options.passed++;
+        *options.out << "PASS " << name << endl;
+    }
+    catch (const exception& e)
+    {
+        options.failed++;
+        *options.out << "FAIL " << name << ": " << e.what() << endl;
+    }
+}
+
+// 等待future就绪，超时返回false
+template<typename Future>
+bool ready(Future& result, chrono::milliseconds timeout = chrono::seconds(5))
+{
+    return result.wait_for(timeout) == future_status::ready;
+}
+
+// ==============================================================================
+// 幂等任务结果缓存
+// ==============================================================================
+
+// 执行时间超过TTL的任务在执行期间不能过期，相同key的提交共享同一次执行
+void testMemoTTLInFlight()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.setMemoCacheTTL(chrono::milliseconds(30));
+    pool.start(2);
+
+    atomic<int> runs{ 0 };
+    auto slow = [&runs](int x) {
+        runs++;
+        this_thread::sleep_for(chrono::milliseconds(150));
+        return x * 2;
+    };
+    size_t key = ThreadPool::makeTaskKey("slow", 21);
+
+    shared_future<int> first = pool.submitMemoTask(key, slow, 21);
+    this_thread::sleep_for(chrono::milliseconds(80));
+    shared_future<int> second = pool.submitMemoTask(key, slow, 21);
+    CHECK(ready(first));
+    CHECK(first.get() == 42);
+    CHECK(second.get() == 42);
+    CHECK(runs == 1);
+
+    // 完成之后超过TTL才过期
+    shared_future<int> cached = pool.submitMemoTask(key, slow, 21);
+    CHECK(cached.get() == 42);
+    CHECK(runs == 1);
+    this_thread::sleep_for(chrono::milliseconds(60));
+    shared_future<int> expired = pool.submitMemoTask(key, slow, 21);
+    CHECK(ready(expired));
+    CHECK(runs == 2);
+}
+
+// ==============================================================================
+// 工作线程暂存区
+// ==============================================================================
+
+struct alignas(128) OverAligned
+{
+    char data[200];
+};
+
+bool aligned(const void* p, size_t align)
+{
+    return reinterpret_cast<uintptr_t>(p) % align == 0;
+}
+
+// 返回的地址本身要按要求对齐，包括超过new默认对齐的情况和申请新块之后
+void testArenaAlignment()
+{
+    ScratchArena arena(1024);
+    for (int round = 0; round < 2; round++)
+    {
+        for (int i = 0; i < 100; i++)
+        {
+            CHECK(arena.allocate(1, 1) != nullptr);
+            CHECK(aligned(arena.allocate(8, 64), 64));
+            CHECK(aligned(arena.allocate<OverAligned>(1), alignof(OverAligned)));
+            CHECK(aligned(arena.allocate(3, 4096), 4096));
+            CHECK(aligned(arena.allocate<double>(3), alignof(double)));
+        }
+        arena.reset();
+    }
+}
+
+// ==============================================================================
+// 工作线程上下文
+// ==============================================================================
+
+// 工作线程中可以取得自己的上下文，其他线程中得到nullptr
+void testWorkerCurrent()
+{
+    ThreadPool pool;
+    pool.start(2);
+
+    future<bool> onWorker = pool.submitTask([&pool] {
+        WorkerContext* worker = ThreadPool::currentWorker();
+        return worker != nullptr && worker->getPool() == &pool;
+    });
+    CHECK(ready(onWorker));
+    CHECK(onWorker.get());
+
+    CHECK(ThreadPool::currentWorker() == nullptr);
+    WorkerContext sentinel(0, nullptr);
+    WorkerContext* offWorker = &sentinel;
+    thread other([&offWorker] { offWorker = ThreadPool::currentWorker(); });
+    other.join();
+    CHECK(offWorker == nullptr);
+}
+
+struct WorkerState
+{
+    int id;
+    int tasks;
+};
+
+// 启动回调中设置的用户数据在这个线程执行的任务中可以取到
+void testWorkerUserData()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.setWorkerInitHook([](WorkerContext& worker) {
+        worker.setUserData(make_shared<WorkerState>(WorkerState{ worker.getId(), 0 }));
+    });
+    pool.start(2);
+
+    vector<future<bool>> results;
+    for (int i = 0; i < 100; i++)
+    {
+        results.push_back(pool.submitTask([] {
+            WorkerContext* worker = ThreadPool::currentWorker();
+            WorkerState* state = worker->getUserData<WorkerState>();
+            if (state == nullptr || state->id != worker->getId())
+                return false;
+            state->tasks++;
+            return true;
+        }));
+    }
+    for (auto& result : results)
+    {
+        CHECK(ready(result));
+        CHECK(result.get());
+    }
+}
+
+// 每个工作线程启动时调用一次启动回调，线程池析构时每个线程调用一次退出回调
+void testWorkerHooks()
+{
+    mutex mtx;
+    vector<int> inits;
+    vector<int> exits;
+    {
+        ThreadPool pool;
+        pool.setWorkerInitHook([&](WorkerContext& worker) {
+            lock_guard<mutex> lock(mtx);
+            inits.push_back(worker.getId());
+        });
+        pool.setWorkerExitHook([&](WorkerContext& worker) {
+            lock_guard<mutex> lock(mtx);
+            exits.push_back(worker.getId());
+        });
+        pool.start(3);
+
+        future<int> result = pool.submitTask([](int x) { return x; }, 1);
+        CHECK(ready(result));
+        this_thread::sleep_for(chrono::milliseconds(50));
+        lock_guard<mutex> lock(mtx);
+        CHECK(inits.size() == 3);
+        CHECK(exits.empty());
+    }
+    sort(inits.begin(), inits.end());
+    sort(exits.begin(), exits.end());
+    CHECK(unique(inits.begin(), inits.end()) == inits.end());
+    CHECK(exits == inits);
+}
+
+// ==============================================================================
+// 取消令牌与任务超时
+// ==============================================================================
+
+// 排在长任务后面的任务到达截止时间时，future立即得到TaskCancelled，不用等到任务出队
+void testCancelDeadlineQueued()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.start(1);
+
+    future<void> blocker = pool.submitTask([] { this_thread::sleep_for(chrono::milliseconds(300)); });
+    atomic<int> runs{ 0 };
+    future<int> result = pool.submitCancellableTask(CancellationToken::withTimeout(chrono::milliseconds(50)),
+        [&runs](const CancellationToken&) { return ++runs; });
+
+    CHECK(ready(result, chrono::milliseconds(150)));
+    bool cancelled = false;
+    try
+    {
+        result.get();
+    }
+    catch (const TaskCancelled&)
+    {
+        cancelled = true;
+    }
+    CHECK(cancelled);
+    CHECK(ready(blocker));
+    this_thread::sleep_for(chrono::milliseconds(20));
+    CHECK(runs == 0);
+}
+
+// 同一个令牌被很多任务复用，已经执行完成的任务不受之后的取消影响
+void testCancelReusedToken()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.start(2);
+
+    CancellationToken token;
+    vector<future<int>> results;
+    for (int i = 0; i < 1000; i++)
+        results.push_back(pool.submitCancellableTask(token, [](const CancellationToken&, int x) { return x; }, i));
+    for (int i = 0; i < 1000; i++)
+    {
+        CHECK(ready(results[i]));
+        CHECK(results[i].get() == i);
+    }
+
+    token.cancel();
+    future<int> late = pool.submitCancellableTask(token, [](const CancellationToken&) { return 1; });
+    CHECK(ready(late));
+    bool cancelled = false;
+    try
+    {
+        late.get();
+    }
+    catch (const TaskCancelled&)
+    {
+        cancelled = true;
+    }
+    CHECK(cancelled);
+}
+
+// 提交时令牌已经取消或者超过截止时间，任务直接取消，不进入队列
+void testCancelBeforeSubmit()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.start(1);
+
+    promise<void> release;
+    shared_future<void> released = release.get_future().share();
+    future<void> blocker = pool.submitTask([released] { released.wait(); });
+
+    CancellationToken cancelled;
+    cancelled.cancel();
+    CancellationToken expired = CancellationToken::withTimeout(chrono::milliseconds(0));
+    this_thread::sleep_for(chrono::milliseconds(5));
+
+    atomic<int> runs{ 0 };
+    auto task = [&runs](const CancellationToken&) { return ++runs; };
+    vector<future<int>> results;
+    results.push_back(pool.submitCancellableTask(cancelled, task));
+    results.push_back(pool.submitCancellableTask(expired, task));
+    CHECK(pool.getStats().taskSize == 0);
+
+    for (auto& result : results)
+    {
+        CHECK(ready(result, chrono::milliseconds(0)));
+        bool isCancelled = false;
+        try
+        {
+            result.get();
+        }
+        catch (const TaskCancelled&)
+        {
+            isCancelled = true;
+        }
+        CHECK(isCancelled);
+    }
+
+    release.set_value();
+    CHECK(ready(blocker));
+    CHECK(runs == 0);
+}
+
+// ==============================================================================
+// 任务失败处理与熔断
+// ==============================================================================
+
+// mode 0 正常返回，1 抛出异常（失败），2 抛出TaskCancelled（不算失败也不算成功）
+int flaky(int mode)
+{
+    if (mode == 1)
+        throw runtime_error("flaky failed");
+    if (mode == 2)
+        throw TaskCancelled();
+    return mode;
+}
+
+// 提交一次flaky，返回future是否因为熔断被拒绝
+bool rejectedByCircuit(ThreadPool& pool, int mode)
+{
+    future<int> result = pool.submitTask(flaky, mode);
+    CHECK(ready(result));
+    try
+    {
+        result.get();
+    }
+    catch (const TaskRejected& e)
+    {
+        return string(e.what()).find("circuit") != string::npos;
+    }
+    catch (const exception&)
+    {
+    }
+    return false;
+}
+
+// 试探任务被取消时，冷却时间结束后可以再放行一个试探任务，熔断不会一直打开
+void testCircuitProbeCancelled()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.setCircuitBreaker(2, chrono::milliseconds(50));
+    pool.start(2);
+
+    CHECK(!rejectedByCircuit(pool, 1));
+    CHECK(!rejectedByCircuit(pool, 1));
+    CHECK(rejectedByCircuit(pool, 0)); // 已经熔断
+
+    this_thread::sleep_for(chrono::milliseconds(60));
+    CHECK(!rejectedByCircuit(pool, 2)); // 试探任务被取消，没有结果
+
+    this_thread::sleep_for(chrono::milliseconds(60));
+    CHECK(!rejectedByCircuit(pool, 0)); // 再次试探并且成功，恢复
+    CHECK(!rejectedByCircuit(pool, 0));
+    CHECK(pool.getStats().failedTaskSize == 2);
+}
+
+// 试探任务因为队列已满被拒绝时，熔断同样不会一直打开
+void testCircuitProbeRejected()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(1);
+    pool.setCircuitBreaker(2, chrono::milliseconds(50));
+    pool.start(1);
+
+    CHECK(!rejectedByCircuit(pool, 1));
+    CHECK(!rejectedByCircuit(pool, 1));
+    this_thread::sleep_for(chrono::milliseconds(60));
+
+    // 占住唯一的工作线程并填满队列，试探任务提交时等待1秒后被拒绝
+    future<int> blocker = pool.submitTask([] { this_thread::sleep_for(chrono::milliseconds(1300)); return 0; });
+    this_thread::sleep_for(chrono::milliseconds(20));
+    future<int> filler = pool.submitTask([] { return 0; });
+    future<int> probe = pool.submitTask(flaky, 0);
+    bool queueFull = false;
+    try
+    {
+        probe.get();
+    }
+    catch (const TaskRejected& e)
+    {
+        queueFull = string(e.what()).find("queue is full") != string::npos;
+    }
+    CHECK(queueFull);
+
+    CHECK(ready(blocker));
+    CHECK(ready(filler));
+    CHECK(!rejectedByCircuit(pool, 0));
+    CHECK(!rejectedByCircuit(pool, 0));
+}
+
+// 不同类别的任务分别熔断
+void testCircuitPerClass()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.setCircuitBreaker(1, chrono::seconds(10));
+    pool.start(2);
+
+    auto failing = [] { throw runtime_error("failed"); };
+    future<void> first = pool.submitTask(failing);
+    CHECK(ready(first));
+    future<void> second = pool.submitTask(failing);
+    CHECK(ready(second));
+    bool rejected = false;
+    try
+    {
+        second.get();
+    }
+    catch (const TaskRejected&)
+    {
+        rejected = true;
+    }
+    CHECK(rejected);
+    CHECK(!rejectedByCircuit(pool, 0));
+}
+
+// ==============================================================================
+// 时间轮
+// ==============================================================================
+
+// 定时任务必须正好在到期的tick触发，跨越各层边界时要经过cascade重新分配
+void testTimerWheelCascade()
+{
+    TimerWheel wheel;
+    wheel.jumpTo(250); // 从一个不在边界上的tick开始，让到期时间跨越第0层的边界
+
+    vector<uint64_t> expires = { 251, 255, 256, 257, 511, 512, 65535, 65536, 65537, 65536 + 300,
+        (1ull << 24) - 1, 1ull << 24, (1ull << 24) + 257 };
+    for (uint64_t expire : expires)
+        wheel.add(make_shared<TimerTask>([] {}, expire, 0));
+
+    size_t fired = 0;
+    while (!wheel.empty())
+    {
+        vector<shared_ptr<TimerTask>> expired;
+        wheel.advance(expired);
+        for (auto& timer : expired)
+        {
+            CHECK(timer->expireTick == wheel.currentTick());
+            fired++;
+        }
+        CHECK(wheel.currentTick() <= (1ull << 24) + 257);
+    }
+    CHECK(fired == expires.size());
+}
+
+// 已经过期的定时任务在下一个tick触发
+void testTimerWheelPastDue()
+{
+    TimerWheel wheel;
+    wheel.jumpTo(1000);
+    wheel.add(make_shared<TimerTask>([] {}, 10, 0));
+
+    vector<shared_ptr<TimerTask>> expired;
+    wheel.advance(expired);
+    CHECK(expired.size() == 1);
+    CHECK(wheel.empty());
+}
+
+// 周期任务错过的周期直接跳过
+void testTimerReschedule()
+{
+    TimerTask timer([] {}, 10, 5);
+    timer.reschedule(10);
+    CHECK(timer.expireTick == 15);
+    timer.reschedule(27); // 错过了 15、20、25
+    CHECK(timer.expireTick == 30);
+}
+
+void testTimerCancel()
+{
+    ThreadPool pool;
+    pool.start(2);
+
+    atomic<int> cancelled{ 0 };
+    atomic<int> control{ 0 };
+    TimerHandle handle = pool.schedule(chrono::milliseconds(50), [&] { cancelled++; });
+    pool.schedule(chrono::milliseconds(50), [&] { control++; });
+    handle.cancel();
+    CHECK(handle.isCancelled());
+
+    // 周期任务取消后不再执行
+    atomic<int> periodic{ 0 };
+    TimerHandle periodicHandle = pool.scheduleAtFixedRate(chrono::milliseconds(20), [&] { periodic++; });
+    this_thread::sleep_for(chrono::milliseconds(150));
+    periodicHandle.cancel();
+    this_thread::sleep_for(chrono::milliseconds(50));
+    int count = periodic;
+    this_thread::sleep_for(chrono::milliseconds(100));
+
+    CHECK(cancelled == 0);
+    CHECK(control == 1);
+    CHECK(count > 0);
+    CHECK(periodic == count);
+}
+
+void testTimerFixedRate()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.start(2);
+
+    atomic<int> count{ 0 };
+    TimerHandle handle = pool.scheduleAtFixedRate(chrono::milliseconds(20), [&] { count++; });
+    this_thread::sleep_for(chrono::milliseconds(410));
+    handle.cancel();
+
+    // 20 次左右，允许调度抖动，但不应该补执行错过的周期
+    CHECK(count >= 10);
+    CHECK(count <= 21);
+}
+
+// 执行时间超过周期的任务不能同时执行多次，执行完成后再按固定频率跳过错过的周期
+void testTimerNoOverlap()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.start(4);
+
+    atomic<int> running{ 0 };
+    atomic<int> maxRunning{ 0 };
+    atomic<int> count{ 0 };
+    TimerHandle handle = pool.scheduleAtFixedRate(chrono::milliseconds(20), [&] {
+        int now = ++running;
+        int prev = maxRunning;
+        while (now > prev && !maxRunning.compare_exchange_weak(prev, now))
+            ;
+        this_thread::sleep_for(chrono::milliseconds(70));
+        count++;
+        running--;
+    });
+    this_thread::sleep_for(chrono::milliseconds(500));
+    handle.cancel();
+    this_thread::sleep_for(chrono::milliseconds(100));
+
+    CHECK(maxRunning == 1);
+    CHECK(count >= 4);
+    CHECK(count <= 7);
+}
+
+// ==============================================================================
+// 分片任务队列
+// ==============================================================================
+
+// 多个生产者向不同分片提交任务，工作线程在两轮之间都会睡眠，不能丢失唤醒
+void testShardWakeup()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.setTaskQueShards(4);
+    pool.start(3);
+
+    const int producers = 8;
+    for (int round = 0; round < 200; round++)
+    {
+        vector<future<int>> results(producers);
+        vector<thread> threads;
+        for (int p = 0; p < producers; p++)
+        {
+            threads.emplace_back([&, p]() {
+                results[p] = pool.submitTask([](int x) { return x; }, p);
+            });
+        }
+        for (auto& t : threads)
+            t.join();
+
+        for (int p = 0; p < producers; p++)
+        {
+            CHECK(ready(results[p]));
+            CHECK(results[p].get() == p);
+        }
+        if (round % 10 == 0)
+            this_thread::sleep_for(chrono::milliseconds(2));
+    }
+}
+
+// 任务比线程多，所有分片中的任务都要被执行
+void testShardDrain()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.setTaskQueShards(8);
+    pool.start(2);
+
+    vector<future<int>> results;
+    for (int i = 0; i < 2000; i++)
+        results.push_back(pool.submitTask([](int x) { return x; }, i));
+    for (int i = 0; i < 2000; i++)
+    {
+        CHECK(ready(results[i]));
+        CHECK(results[i].get() == i);
+    }
+}
+
+// ==============================================================================
+// TaskGroup
+// ==============================================================================
+
+long long parallelSum(ThreadPool& pool, int begin, int end)
+{
+    if (end - begin <= 16)
+    {
+        long long sum = 0;
+        for (int i = begin; i < end; i++)
+            sum += i;
+        return sum;
+    }
+
+    int mid = begin + (end - begin) / 2;
+    long long left = 0;
+    long long right = 0;
+    TaskGroup group(pool);
+    group.spawn([&] { left = parallelSum(pool, begin, mid); });
+    group.spawn([&] { right = parallelSum(pool, mid, end); });
+    group.wait();
+    return left + right;
+}
+
+// 只有一个工作线程时递归地等待子任务，工作线程必须帮忙执行队列中的任务而不是死锁
+void testTaskGroupRecursion()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.start(1);
+
+    const int n = 4096;
+    future<long long> result = pool.submitTask(parallelSum, ref(pool), 0, n);
+    CHECK(ready(result, chrono::seconds(10)));
+    CHECK(result.get() == (long long)n * (n - 1) / 2);
+}
+
+// 子任务的异常在wait()中重新抛出
+void testTaskGroupException()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.start(2);
+
+    TaskGroup group(pool);
+    group.spawn([] { throw logic_error("child failed"); });
+    group.spawn([] {});
+
+    bool caught = false;
+    try
+    {
+        group.wait();
+    }
+    catch (const logic_error&)
+    {
+        caught = true;
+    }
+    CHECK(caught);
+}
+
+// ==============================================================================
+// 自适应线程数量
+// ==============================================================================
+
+// 没有任务时控制器逐步回收空闲线程，线程数量不低于下限
+void testAdaptiveShrink()
+{
+    ThreadPool pool;
+    pool.setAdaptiveSizing(2, 8, chrono::milliseconds(20));
+    pool.start(6);
+
+    this_thread::sleep_for(chrono::milliseconds(400));
+    PoolStats stats = pool.getStats();
+    CHECK(stats.adjustmentCount > 0);
+    CHECK(stats.targetThreadSize == 2);
+    CHECK(stats.curThreadSize == 2);
+
+    // 回收线程之后仍然可以正常执行任务
+    future<int> result = pool.submitTask([](int x) { return x; }, 7);
+    CHECK(ready(result));
+    CHECK(result.get() == 7);
+}
+
+// 积压的任务主要在等待I/O时，吞吐量随线程数量增加，控制器应该一直增加线程，不会停在二十个线程左右
+void testAdaptiveGrow()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.setAdaptiveSizing(2, 32, chrono::milliseconds(50));
+    pool.start(2);
+
+    atomic_bool stop{ false };
+    for (int i = 0; i < 100000; i++)
+    {
+        pool.submitTask([&stop] {
+            if (!stop)
+                this_thread::sleep_for(chrono::milliseconds(2));
+        });
+    }
+
+    PoolStats stats = pool.getStats();
+    auto deadline = chrono::steady_clock::now() + chrono::seconds(5);
+    while (stats.curThreadSize < 28 && chrono::steady_clock::now() < deadline)
+    {
+        this_thread::sleep_for(chrono::milliseconds(50));
+        stats = pool.getStats();
+    }
+    stop = true;
+    CHECK(stats.curThreadSize >= 28);
+    CHECK(stats.taskSize > 0);
+}
+
+// ==============================================================================
+// 任务参数的移动
+// ==============================================================================
+
+// 只能移动的参数和捕获了只能移动的对象的函数对象，三种提交方式都可以使用
+void testMoveOnly()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.start(2);
+
+    auto deref = [](unique_ptr<int> p) { return *p; };
+    future<int> arg = pool.submitTask(deref, make_unique<int>(1));
+    future<int> capture = pool.submitTask([p = make_unique<int>(2)]() { return *p; });
+    CHECK(ready(arg));
+    CHECK(arg.get() == 1);
+    CHECK(ready(capture));
+    CHECK(capture.get() == 2);
+
+    shared_future<int> memoArg = pool.submitMemoTask(1, deref, make_unique<int>(3));
+    shared_future<int> memoCapture = pool.submitMemoTask(2, [p = make_unique<int>(4)]() { return *p; });
+    CHECK(ready(memoArg));
+    CHECK(memoArg.get() == 3);
+    CHECK(ready(memoCapture));
+    CHECK(memoCapture.get() == 4);
+
+    CancellationToken token;
+    future<int> cancellableArg = pool.submitCancellableTask(token,
+        [](const CancellationToken&, unique_ptr<int> p) { return *p; }, make_unique<int>(5));
+    future<int> cancellableCapture = pool.submitCancellableTask(token,
+        [p = make_unique<int>(6)](const CancellationToken&) { return *p; });
+    CHECK(ready(cancellableArg));
+    CHECK(cancellableArg.get() == 5);
+    CHECK(ready(cancellableCapture));
+    CHECK(cancellableCapture.get() == 6);
+}
+
+// 记录拷贝次数的参数类型，移动不计数
+struct CopyCounter
+{
+    static atomic<int> copies;
+
+    CopyCounter() = default;
+    CopyCounter(const CopyCounter&) { copies++; }
+    CopyCounter(CopyCounter&&) noexcept {}
+    CopyCounter& operator=(const CopyCounter&) { copies++; return *this; }
+    CopyCounter& operator=(CopyCounter&&) noexcept { return *this; }
+};
+
+atomic<int> CopyCounter::copies{ 0 };
+
+// 右值参数和函数对象从提交到执行只移动，不拷贝
+void testMoveNoCopies()
+{
+    ThreadPool pool;
+    pool.setTaskQueMaxThreshHold(INT_MAX);
+    pool.start(2);
+
+    auto byValue = [](CopyCounter) { return 1; };
+    CopyCounter captured;
+    auto capturing = [captured]() { return 1; };
+    CopyCounter::copies = 0; // 创建lambda时的拷贝不计算在内
+
+    future<int> arg = pool.submitTask(byValue, CopyCounter());
+    future<int> capture = pool.submitTask(std::move(capturing));
+    CHECK(ready(arg));
+    CHECK(arg.get() == 1);
+    CHECK(ready(capture));
+    CHECK(capture.get() == 1);
+
+    shared_future<int> memo = pool.submitMemoTask(1, byValue, CopyCounter());
+    CHECK(ready(memo));
+    CHECK(memo.get() == 1);
+
+    future<int> cancellable = pool.submitCancellableTask(CancellationToken(),
+        [](const CancellationToken&, CopyCounter) { return 1; }, CopyCounter());
+    CHECK(ready(cancellable));
+    CHECK(cancellable.get() == 1);
+
+    CHECK(CopyCounter::copies == 0);
+}
+
+int main(int argc, char* argv[])
+{
+    Options options;
+    for (int i = 1; i < argc; i++)
+    {
+        string arg = argv[i];
+        if (arg == "--filter" && i + 1 < argc)
+            options.filter = argv[++i];
+        else
+        {
+            cerr << "Usage: " << argv[0] << " [--filter 名称前缀]" << endl;
+            return 1;
+        }
+    }
+
+    // 线程池每取到一个任务都向 cout 输出一行日志，测试期间丢弃这些输出，结果写到原来的标准输出
+    ostream results(cout.rdbuf());
+    NullBuffer null;
+    options.out = &results;
+    cout.rdbuf(&null);
+
+    runTest(options, "memo_ttl_in_flight", testMemoTTLInFlight);
+
+    runTest(options, "arena_alignment", testArenaAlignment);
+
+    runTest(options, "worker_current", testWorkerCurrent);
+    runTest(options, "worker_user_data", testWorkerUserData);
+    runTest(options, "worker_hooks", testWorkerHooks);
+
+    runTest(options, "cancel_deadline_queued", testCancelDeadlineQueued);
+    runTest(options, "cancel_reused_token", testCancelReusedToken);
+    runTest(options, "cancel_before_submit", testCancelBeforeSubmit);
+
+    runTest(options, "circuit_probe_cancelled", testCircuitProbeCancelled);
+    runTest(options, "circuit_probe_rejected", testCircuitProbeRejected);
+    runTest(options, "circuit_per_class", testCircuitPerClass);
+
+    runTest(options, "timer_wheel_cascade", testTimerWheelCascade);
+    runTest(options, "timer_wheel_past_due", testTimerWheelPastDue);
+    runTest(options, "timer_reschedule", testTimerReschedule);
+    runTest(options, "timer_cancel", testTimerCancel);
+    runTest(options, "timer_fixed_rate", testTimerFixedRate);
+    runTest(options, "timer_no_overlap", testTimerNoOverlap);
+
+    runTest(options, "shard_wakeup", testShardWakeup);
+    runTest(options, "shard_drain", testShardDrain);
+
+    runTest(options, "taskgroup_recursion", testTaskGroupRecursion);
+    runTest(options, "taskgroup_exception", testTaskGroupException);
+
+    runTest(options, "adaptive_shrink", testAdaptiveShrink);
+    runTest(options, "adaptive_grow", testAdaptiveGrow);
+
+    runTest(options, "move_only", testMoveOnly);
+    runTest(options, "move_no_copies", testMoveNoCopies);
+
+    cout.rdbuf(results.rdbuf());
+    if (options.passed + options.failed == 0)
+    {
+        cerr << "没有匹配 \"" << options.filter << "\" 的测试" << endl;
+        return 1;
+    }
+    return options.failed == 0 ? 0 : 1;
+}
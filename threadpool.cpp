@@ -75,7 +75,15 @@ int main()
     cout << r2.get() << endl;
     cout << r3.get() << endl;
     cout << r4.get() << endl;
-    cout << r5.get() << endl;
+    // 任务队列已满时提交失败，future中保存TaskRejected异常
+    try
+    {
+        cout << r5.get() << endl;
+    }
+    catch (const TaskRejected& e)
+    {
+        cout << e.what() << endl;
+    }
 
     //packaged_task<int(int, int)> task(sum1);
     //// future <=> Result
@@ -12,10 +12,34 @@
 #include <unordered_map>
 #include <thread>
 #include <future>
+#include <list>
+#include <algorithm>
+#include <string>
+#include <chrono>
+#include <typeinfo>
+#include <typeindex>
+#include <stdexcept>
+#include <cstddef>
+#include <cstdint>
+#include <tuple>
+#include <utility>
+#include <type_traits>
+#include <cmath>
 
 const int TASK_MAX_THRESHHOLD = 2; // INT32_MAX;
 const int THREAD_MAX_THRESHHOLD = 1024;
 const int THREAD_MAX_IDLE_TIME = 60; // λ
+const size_t WORKER_ARENA_SIZE = 64 * 1024; // ÿ߳ݴĳʼСλֽ
+const int ADAPTIVE_SAMPLE_INTERVAL = 500; // Ӧ߳Ĳڣλ
+const double ADAPTIVE_DAMPING = 0.05; // 仯С5%Ϊ߳
+const int ADAPTIVE_STEP_DIVISOR = 8; // ÿӵǰ߳1/81̶߳ʱһεı仯ܳ
+const int CACHE_LINE_SIZE = 64; // дСλֽ
+const int TIMER_WHEEL_TICK = 10; // ʱֵľȣλ
+const int TIMER_WHEEL_SLOT_BITS = 8; // ʱÿһ 2^8 = 256 
+const int TIMER_WHEEL_LEVELS = 4; // ʱֵĲԱʾ 2^32 tick
+const int MEMO_CACHE_SHARDS = 16; // ķƬ
+const int MEMO_CACHE_CAPACITY = 1024; // зƬ֮ͣ
+const int CIRCUIT_TABLE_SIZE = 1024; // ۶״̬ĴСҲֶ
 
 
 // ֵ̳֧߳ģʽ
@@ -61,6 +85,693 @@ private:
 
 int Thread::generateId_ = 0;
 
+// ̵߳ݴbump allocator
+// ֻܷ䲻ܵͷţÿִɺ̳߳ͳһresetڴһ
+class ScratchArena
+{
+public:
+	ScratchArena(size_t capacity)
+		: offset_(0)
+	{
+		blocks_.emplace_back(new char[capacity], capacity);
+	}
+
+	// sizeֽڣalign
+	void* allocate(size_t size, size_t align = alignof(std::max_align_t))
+	{
+		Block& block = blocks_.back();
+		// ʵʵַǿƫƣnew char[]ֻ֤__STDCPP_DEFAULT_NEW_ALIGNMENT__
+		uintptr_t base = reinterpret_cast<uintptr_t>(block.first.get());
+		size_t begin = (base + offset_ + align - 1) / align * align - base;
+		if (begin + size > block.second)
+		{
+			// ǰ鲻ãһ¿飬resetʱٺϲ
+			size_t capacity = std::max(size + align, block.second * 2);
+			blocks_.emplace_back(new char[capacity], capacity);
+			offset_ = 0;
+			return allocate(size, align);
+		}
+		offset_ = begin + size;
+		return blocks_.back().first.get() + begin;
+	}
+
+	// nT͵Ķ󣨲ù캯
+	template<typename T>
+	T* allocate(size_t n)
+	{
+		return static_cast<T*>(allocate(n * sizeof(T), alignof(T)));
+	}
+
+	// ͷűڴ
+	void reset()
+	{
+		if (blocks_.size() > 1)
+		{
+			// һݣϲһ㹻Ŀ飬֮Ҫ
+			size_t capacity = 0;
+			for (auto& block : blocks_)
+				capacity += block.second;
+			blocks_.clear();
+			blocks_.emplace_back(new char[capacity], capacity);
+		}
+		offset_ = 0;
+	}
+
+	// ȡݴ
+	size_t capacity() const
+	{
+		size_t capacity = 0;
+		for (auto& block : blocks_)
+			capacity += block.second;
+		return capacity;
+	}
+
+private:
+	using Block = std::pair<std::unique_ptr<char[]>, size_t>;
+	std::vector<Block> blocks_; // һǵǰڷĿ
+	size_t offset_; // ǰѷֽ
+};
+
+// ȡʱfutureб쳣
+class TaskCancelled : public std::runtime_error
+{
+public:
+	TaskCancelled()
+		: std::runtime_error("task cancelled")
+	{}
+};
+
+// ûноͱܾʱѾ۶ϣfutureб쳣
+class TaskRejected : public std::runtime_error
+{
+public:
+	TaskRejected(const std::string& reason)
+		: std::runtime_error(reason)
+	{}
+};
+
+// Эʽȡ
+// ƿԿ֮乲ͬһȡ״̬
+// ڶʱȡ񲻻ᱻִУfutureõTaskCancelled쳣
+// ѾִʱȡֻԼѯisCancelled()ǰ
+class CancellationToken
+{
+public:
+	using Clock = std::chrono::steady_clock;
+
+	CancellationToken()
+		: state_(std::make_shared<State>())
+	{}
+
+	// һtimeoutʱԶȡ
+	static CancellationToken withTimeout(std::chrono::milliseconds timeout)
+	{
+		CancellationToken token;
+		token.state_->deadline = Clock::now() + timeout;
+		return token;
+	}
+
+	// ȡ֪ͨлڶе
+	void cancel()
+	{
+		std::unordered_map<size_t, std::function<void()>> callbacks;
+		{
+			std::lock_guard<std::mutex> lock(state_->mtx);
+			if (state_->cancelled.exchange(true))
+				return;
+			callbacks.swap(state_->callbacks);
+		}
+		for (auto& callback : callbacks)
+		{
+			callback.second();
+		}
+	}
+
+	// ǷѾȡѾֹʱ
+	bool isCancelled() const
+	{
+		return state_->cancelled || Clock::now() >= state_->deadline;
+	}
+
+private:
+	friend class ThreadPool;
+
+	// עȡصѾȡִ
+	// ػصidӺremoveCallbackɾͬһƱܶʱصԽԽ
+	size_t onCancel(std::function<void()> callback)
+	{
+		{
+			std::lock_guard<std::mutex> lock(state_->mtx);
+			if (!state_->cancelled)
+			{
+				size_t id = ++state_->generateId;
+				state_->callbacks.emplace(id, std::move(callback));
+				return id;
+			}
+		}
+		callback();
+		return 0;
+	}
+
+	// ɾȡصصѾִйidΪ0ʱ
+	void removeCallback(size_t id)
+	{
+		if (id == 0)
+			return;
+		std::lock_guard<std::mutex> lock(state_->mtx);
+		state_->callbacks.erase(id);
+	}
+
+	struct State
+	{
+		State()
+			: cancelled(false)
+			, deadline(Clock::time_point::max())
+			, generateId(0)
+		{}
+
+		std::atomic_bool cancelled;
+		Clock::time_point deadline; // ֹʱ䣬ûʱΪtime_point::max()
+		std::mutex mtx;
+		size_t generateId; // ɻصid
+		std::unordered_map<size_t, std::function<void()>> callbacks; // ȡʱִеĻص
+	};
+	std::shared_ptr<State> state_;
+};
+
+class ThreadPool;
+
+// ߳
+// ͨThreadPool::currentWorker()ȡִԼĹ̵߳Ϣ
+class WorkerContext
+{
+public:
+	WorkerContext(int id, ThreadPool* pool)
+		: id_(id)
+		, pool_(pool)
+		, arena_(WORKER_ARENA_SIZE)
+	{}
+
+	// ȡ߳id
+	int getId() const
+	{
+		return id_;
+	}
+
+	// ȡ̳߳߳
+	ThreadPool* getPool() const
+	{
+		return pool_;
+	}
+
+	// ȡ̵߳ݴÿִɺᱻreset
+	ScratchArena& arena()
+	{
+		return arena_;
+	}
+
+	// ûԶ߳״̬һ߳ص
+	void setUserData(std::shared_ptr<void> data)
+	{
+		userData_ = std::move(data);
+	}
+
+	// ȡûԶ߳״̬
+	template<typename T>
+	T* getUserData() const
+	{
+		return static_cast<T*>(userData_.get());
+	}
+
+private:
+	int id_;
+	ThreadPool* pool_;
+	ScratchArena arena_;
+	std::shared_ptr<void> userData_;
+};
+
+// ݵĽ
+// keyֳɷƬÿƬƬڲLRṶѡTTL
+// ŵshared_futureͬkeyĲύͬһִеsingle-flight
+class MemoCache
+{
+public:
+	using Clock = std::chrono::steady_clock;
+
+	MemoCache()
+		: shards_(MEMO_CACHE_SHARDS)
+		, shardCapacity_(MEMO_CACHE_CAPACITY / MEMO_CACHE_SHARDS)
+		, ttl_(0)
+		, generateId_(0)
+	{}
+
+	// û
+	void setCapacity(int capacity)
+	{
+		shardCapacity_ = std::max(1, capacity / (int)shards_.size());
+	}
+
+	// ûĴʱ䣬0ʾ
+	void setTTL(std::chrono::milliseconds ttl)
+	{
+		ttl_ = ttl;
+	}
+
+	// keyӦĽзtrueͨresult
+	// δresultǼΪkeyĽfalse߸ִidںerase
+	template<typename RType>
+	bool getOrInsert(size_t key, std::shared_future<RType>& result, size_t& id)
+	{
+		Shard& shard = shards_[key % shards_.size()];
+		std::lock_guard<std::mutex> lock(shard.mtx);
+
+		auto it = shard.index.find(key);
+		if (it != shard.index.end())
+		{
+			Entry& entry = *it->second;
+			// ִе񲻻ڣִʱ䳬TTLᱻظִ
+			bool expired = ttl_.count() > 0 && entry.ready && Clock::now() - entry.readyTime >= ttl_;
+			if (!expired && entry.type == std::type_index(typeid(RType)))
+			{
+				// УƶLRUͷ
+				shard.lru.splice(shard.lru.begin(), shard.lru, it->second);
+				result = *std::static_pointer_cast<std::shared_future<RType>>(entry.value);
+				return true;
+			}
+			shard.lru.erase(it->second);
+			shard.index.erase(it);
+		}
+
+		id = ++generateId_;
+		shard.lru.push_front(Entry{ key, id, std::type_index(typeid(RType)),
+			std::make_shared<std::shared_future<RType>>(result), false, Clock::time_point() });
+		shard.index[key] = shard.lru.begin();
+
+		// Ƭ̭δʹõĻ
+		// ִ̭Уshared_futureĵ߲Ӱ
+		while (shard.lru.size() > shardCapacity_)
+		{
+			shard.index.erase(shard.lru.back().key);
+			shard.lru.pop_back();
+		}
+		return false;
+	}
+
+	// ɾkeyӦĻidƥ˵ѾµĻ滻
+	void erase(size_t key, size_t id)
+	{
+		Shard& shard = shards_[key % shards_.size()];
+		std::lock_guard<std::mutex> lock(shard.mtx);
+
+		auto it = shard.index.find(key);
+		if (it != shard.index.end() && it->second->id == id)
+		{
+			shard.lru.erase(it->second);
+			shard.index.erase(it);
+		}
+	}
+
+	// ִɣʼ㻺Ĵʱ
+	void markReady(size_t key, size_t id)
+	{
+		Shard& shard = shards_[key % shards_.size()];
+		std::lock_guard<std::mutex> lock(shard.mtx);
+
+		auto it = shard.index.find(key);
+		if (it != shard.index.end() && it->second->id == id)
+		{
+			it->second->ready = true;
+			it->second->readyTime = Clock::now();
+		}
+	}
+
+private:
+	struct Entry
+	{
+		size_t key;
+		size_t id; // ͬһkeyȺĻ
+		std::type_index type; // ֵֹͣͬ͵keyͻ
+		std::shared_ptr<void> value; // ָstd::shared_future<RType>
+		bool ready; // ǷѾִ
+		Clock::time_point readyTime; // ִɵʱ䣬TTLʱʼ
+	};
+
+	struct Shard
+	{
+		std::mutex mtx;
+		std::list<Entry> lru; // ͷʹõĻ
+		std::unordered_map<size_t, std::list<Entry>::iterator> index;
+	};
+
+	std::vector<Shard> shards_;
+	size_t shardCapacity_; // ÿƬ
+	std::chrono::milliseconds ttl_; // ʱ
+	std::atomic<size_t> generateId_;
+};
+
+// ʱ
+struct TimerTask
+{
+	TimerTask(std::function<void()> func, uint64_t expireTick, uint64_t periodTicks)
+		: func(std::move(func))
+		, expireTick(expireTick)
+		, periodTicks(periodTicks)
+		, cancelled(false)
+		, runOnTimerThread(false)
+	{}
+
+	// ִкһεڵtickѾֱִ
+	void reschedule(uint64_t currentTick)
+	{
+		uint64_t missed = (currentTick - expireTick) / periodTicks + 1;
+		expireTick += missed * periodTicks;
+	}
+
+	std::function<void()> func;
+	uint64_t expireTick; // ڵtick
+	uint64_t periodTicks; // ļ0ʾִֻһ
+	std::atomic_bool cancelled;
+	bool runOnTimerThread; // ֱڶʱִ߳УУֻں̵ܶڲص
+};
+
+// ʱľȡʱ
+class TimerHandle
+{
+public:
+	TimerHandle() = default;
+	TimerHandle(std::shared_ptr<TimerTask> timer)
+		: timer_(std::move(timer))
+	{}
+
+	// ȡʱѾ̳߳ػûִеҲִ
+	void cancel()
+	{
+		if (timer_)
+			timer_->cancelled = true;
+	}
+
+	bool isCancelled() const
+	{
+		return !timer_ || timer_->cancelled;
+	}
+
+private:
+	std::shared_ptr<TimerTask> timer_;
+};
+
+// ֲʱ֣Hashed Hierarchical Timing Wheels
+// levelһ۱ʾ 2^(8*level) tickÿǰһtickO(1)
+// ߲ĲڵͲתһȦʱ·䵽Ͳ㣨cascade
+// ̰߳ȫģ̳߳صtimerMtx_
+class TimerWheel
+{
+public:
+	TimerWheel()
+		: currentTick_(0)
+		, size_(0)
+	{}
+
+	// ӶʱѾڵһtickĲۣǰtickĲѾˣ
+	void add(std::shared_ptr<TimerTask> timer)
+	{
+		insert(std::move(timer), currentTick_ + 1);
+	}
+
+	// ǰһtickڵĶʱexpired
+	void advance(std::vector<std::shared_ptr<TimerTask>>& expired)
+	{
+		const uint64_t mask = (1ull << TIMER_WHEEL_SLOT_BITS) - 1;
+		currentTick_++;
+
+		// ͲתһȦѸ߲㵱ǰ·䵽Ͳ
+		for (int level = 1; level < TIMER_WHEEL_LEVELS; level++)
+		{
+			if ((currentTick_ & ((1ull << (TIMER_WHEEL_SLOT_BITS * level)) - 1)) != 0)
+				break;
+
+			size_t slot = (currentTick_ >> (TIMER_WHEEL_SLOT_BITS * level)) & mask;
+			std::vector<std::shared_ptr<TimerTask>> timers;
+			timers.swap(slots_[level][slot]);
+			size_ -= timers.size();
+			for (auto& timer : timers)
+			{
+				// ͻᴦǰtickĵ0ۣڵǰtickڵƳ
+				insert(std::move(timer), currentTick_);
+			}
+		}
+
+		std::vector<std::shared_ptr<TimerTask>>& slot = slots_[0][currentTick_ & mask];
+		size_ -= slot.size();
+		for (auto& timer : slot)
+		{
+			expired.emplace_back(std::move(timer));
+		}
+		slot.clear();
+	}
+
+	// ʱΪʱֱָtick
+	void jumpTo(uint64_t tick)
+	{
+		if (size_ == 0 && tick > currentTick_)
+			currentTick_ = tick;
+	}
+
+	uint64_t currentTick() const
+	{
+		return currentTick_;
+	}
+
+	bool empty() const
+	{
+		return size_ == 0;
+	}
+
+private:
+	// ʱӦĲۣearliestearliest
+	void insert(std::shared_ptr<TimerTask> timer, uint64_t earliest)
+	{
+		const uint64_t mask = (1ull << TIMER_WHEEL_SLOT_BITS) - 1;
+		const uint64_t maxDelta = (1ull << (TIMER_WHEEL_SLOT_BITS * TIMER_WHEEL_LEVELS)) - 1;
+
+		uint64_t expire = std::max(timer->expireTick, earliest);
+		// ʱַΧȷ߲ԶĲۣ֮cascadeʱ¼
+		expire = std::min(expire, currentTick_ + maxDelta);
+		uint64_t delta = expire - currentTick_;
+
+		int level = 0;
+		while (level < TIMER_WHEEL_LEVELS - 1
+			&& delta >= (1ull << (TIMER_WHEEL_SLOT_BITS * (level + 1))))
+		{
+			level++;
+		}
+		size_t slot = (expire >> (TIMER_WHEEL_SLOT_BITS * level)) & mask;
+		slots_[level][slot].emplace_back(std::move(timer));
+		size_++;
+	}
+
+	std::vector<std::shared_ptr<TimerTask>> slots_[TIMER_WHEEL_LEVELS][1 << TIMER_WHEEL_SLOT_BITS];
+	uint64_t currentTick_; // ǰtick
+	size_t size_; // ʱеĶʱ
+};
+
+// Ͳֵ棨ֵƶֵһݣstd::threadһ
+// ִʱѺͲƶãԿunique_ptrֻƶͣ
+// ĲڵúѾߣÿTaskCallִֻһΣҪʱʹstd::ref
+template<typename Func, typename... Args>
+class TaskCall
+{
+public:
+	// call()һֵústd::result_ofC++17Ѿ
+	using Result = decltype(std::declval<Func>()(std::declval<Args>()...));
+
+	TaskCall(Func func, Args... args)
+		: func_(std::move(func))
+		, args_(std::move(args)...)
+	{}
+
+	Result operator()()
+	{
+		return call(std::index_sequence_for<Args...>());
+	}
+
+private:
+	template<size_t... I>
+	Result call(std::index_sequence<I...>)
+	{
+		return std::move(func_)(std::move(std::get<I>(args_))...);
+	}
+
+	Func func_;
+	std::tuple<Args...> args_;
+};
+
+template<typename Func, typename... Args>
+TaskCall<std::decay_t<Func>, std::decay_t<Args>...> makeTaskCall(Func&& func, Args&&... args)
+{
+	return TaskCall<std::decay_t<Func>, std::decay_t<Args>...>(
+		std::forward<Func>(func), std::forward<Args>(args)...);
+}
+
+// ķֵ
+template<typename Func, typename... Args>
+using TaskResult = typename TaskCall<std::decay_t<Func>, std::decay_t<Args>...>::Result;
+
+// ۶ϰͳʧܴ
+// ֣ÿlambdaǲַͬͣͨ
+template<typename Func>
+struct TaskClassOf
+{
+	static size_t get(const Func&)
+	{
+		// hash_codeҪַhashÿֻһ
+		static const size_t taskClass = std::type_index(typeid(Func)).hash_code();
+		return taskClass;
+	}
+};
+
+template<typename R, typename... A>
+struct TaskClassOf<R(*)(A...)>
+{
+	static size_t get(R(*func)(A...))
+	{
+		return std::hash<uintptr_t>()(reinterpret_cast<uintptr_t>(func));
+	}
+};
+
+// һ۶״̬
+// ʧܴﵽֵ۶ϣȴʱֱӾܾȴһ̽ɹָ
+struct CircuitState
+{
+	CircuitState()
+		: consecutiveFailures(0)
+		, openUntil(0)
+	{}
+
+	// Ƿύ
+	// ȴһ̽ͬʱ۶Ͻʱƺһȴʱ䣺
+	// ̽񱻾ܾȡһֱûнʱһȴʱٷһ۶ϲһֱ
+	bool allow(std::chrono::milliseconds cooldown)
+	{
+		int64_t until = openUntil.load(std::memory_order_acquire);
+		if (until == 0)
+			return true;
+		int64_t current = now();
+		if (current < until)
+			return false;
+		return openUntil.compare_exchange_strong(until,
+			current + std::chrono::duration_cast<std::chrono::nanoseconds>(cooldown).count());
+	}
+
+	void recordSuccess()
+	{
+		if (consecutiveFailures.load(std::memory_order_relaxed) == 0)
+			return;
+		consecutiveFailures = 0;
+		openUntil = 0;
+	}
+
+	void recordFailure(int threshold, std::chrono::milliseconds cooldown)
+	{
+		if (++consecutiveFailures >= threshold)
+		{
+			openUntil = now() + std::chrono::duration_cast<std::chrono::nanoseconds>(cooldown).count();
+		}
+	}
+
+	static int64_t now()
+	{
+		return std::chrono::duration_cast<std::chrono::nanoseconds>(
+			std::chrono::steady_clock::now().time_since_epoch()).count();
+	}
+
+	std::atomic_int consecutiveFailures; // ʧܴ
+	std::atomic<int64_t> openUntil; // ۶Ͻһη̽񣩵ʱ䣬0ʾû۶
+};
+
+// ÿ۶״̬
+// ѰַϣֻԭӶһһʱCASռһۣ۲ᱻͷ
+// ۶ϺÿύҪңŶͬһ
+class CircuitTable
+{
+public:
+	CircuitTable()
+		: slots_(new Slot[CIRCUIT_TABLE_SIZE])
+	{}
+
+	~CircuitTable()
+	{
+		for (int i = 0; i < CIRCUIT_TABLE_SIZE; i++)
+		{
+			delete slots_[i].state.load();
+		}
+	}
+
+	// ȡһ۶״̬Ѿ˷nullptr۶ϣ
+	CircuitState* get(size_t taskClass)
+	{
+		size_t key = taskClass == 0 ? 1 : taskClass; // 0ʾղ
+		uint64_t home = ((uint64_t)key * 0x9e3779b97f4a7c15ull) >> 32; // ַĵλ0ȴɢ
+		for (int i = 0; i < CIRCUIT_TABLE_SIZE; i++)
+		{
+			Slot& slot = slots_[(home + i) % CIRCUIT_TABLE_SIZE];
+			size_t current = slot.key.load(std::memory_order_acquire);
+			if (current == 0)
+			{
+				if (slot.key.compare_exchange_strong(current, key))
+				{
+					CircuitState* state = new CircuitState();
+					slot.state.store(state, std::memory_order_release);
+					return state;
+				}
+				// ߳ռãcurrentдkey
+			}
+			if (current == key)
+			{
+				// ռò۵ܻ߳̿ûд״̬
+				CircuitState* state;
+				while ((state = slot.state.load(std::memory_order_acquire)) == nullptr)
+					std::this_thread::yield();
+				return state;
+			}
+		}
+		return nullptr;
+	}
+
+	CircuitTable(const CircuitTable&) = delete;
+	CircuitTable& operator=(const CircuitTable&) = delete;
+
+private:
+	struct Slot
+	{
+		Slot()
+			: key(0)
+			, state(nullptr)
+		{}
+
+		std::atomic<size_t> key; // 0ʾղ
+		std::atomic<CircuitState*> state;
+	};
+
+	std::unique_ptr<Slot[]> slots_;
+};
+
+// ̳߳״̬ͳ
+struct PoolStats
+{
+	int curThreadSize; // ǰ߳
+	int idleThreadSize; // ߳
+	int taskSize; // е
+	long long completedTaskSize; // Ѿִɵʧܵ
+	long long failedTaskSize; // ִʱ׳쳣
+	long long rejectedTaskSize; // ۶ϣûִоͱܾ
+
+	// Ӧ߳״̬ûпʱΪ0
+	double throughput; // һβƽ󣩣λ/
+	int targetThreadSize; // ߳
+	int lastAdjustment; // һε߳ʾӣʾ
+	long long adjustmentCount; // ܴ߳
+};
+
 // ̳߳
 class ThreadPool
 {
@@ -68,13 +779,33 @@ public:
 	// ̳߳ع
 	ThreadPool()
 		: initThreadSize_(0)
+		, taskQueShards_(new TaskQueShard[1])
+		, taskQueShardSize_(1)
 		, taskSize_(0)
+		, sleepingThreadSize_(0)
+		, waitingProducerSize_(0)
 		, idleThreadSize_(0)
 		, curThreadSize_(0)
 		, taskQueMaxThreshHold_(TASK_MAX_THRESHHOLD)
 		, threadSizeThreshHold_(THREAD_MAX_THRESHHOLD)
 		, poolMode_(PoolMode::MODE_FIXED)
 		, isPoolRunning_(false)
+		, completedTaskSize_(0)
+		, failedTaskSize_(0)
+		, rejectedTaskSize_(0)
+		, circuitThreshold_(0)
+		, circuitCooldown_(0)
+		, retireThreadSize_(0)
+		, adaptive_(false)
+		, adaptiveMinThreadSize_(0)
+		, adaptiveMaxThreadSize_(0)
+		, adaptiveInterval_(ADAPTIVE_SAMPLE_INTERVAL)
+		, throughput_(0)
+		, targetThreadSize_(0)
+		, lastAdjustment_(0)
+		, adjustmentCount_(0)
+		, timerRunning_(false)
+		, timerStartTime_(std::chrono::steady_clock::now())
 	{}
 
 	// ̳߳
@@ -82,9 +813,30 @@ public:
 	{
 		isPoolRunning_ = false;
 
+		// ֹͣʱ̣߳ûڵĶʱ񱻶
+		{
+			std::lock_guard<std::mutex> lock(timerMtx_);
+			timerRunning_ = false;
+			timerCond_.notify_all();
+		}
+		if (timerThread_.joinable())
+		{
+			timerThread_.join();
+		}
+
+		// ֹͣӦڻ̵߳ͬʱµ߳
+		{
+			std::lock_guard<std::mutex> lock(controllerMtx_);
+			controllerCond_.notify_all();
+		}
+		if (controller_.joinable())
+		{
+			controller_.join();
+		}
+
 		// ȴ̳߳е̷߳  ״̬ & ִ
+		wakeAllWorkers();
 		std::unique_lock<std::mutex> lock(taskQueMtx_);
-		notEmpty_.notify_all();
 		exitCond_.wait(lock, [&]()->bool {return threads_.size() == 0; });
 	}
 
@@ -104,6 +856,16 @@ public:
 		taskQueMaxThreshHold_ = threshhold;
 	}
 
+	// еķƬ߳ͬʱύʱɢ
+	// ÿύ̶̹߳һƬ߳ȡԼķƬɨƬ
+	void setTaskQueShards(int shards)
+	{
+		if (checkRunningState())
+			return;
+		taskQueShardSize_ = std::max(1, shards);
+		taskQueShards_.reset(new TaskQueShard[taskQueShardSize_]);
+	}
+
 	// ̳߳cachedģʽֵ߳
 	void setThreadSizeThreshHold(int threshhold)
 	{
@@ -115,123 +877,688 @@ public:
 		}
 	}
 
+	// ݵ
+	void setMemoCacheCapacity(int capacity)
+	{
+		if (checkRunningState())
+			return;
+		memoCache_.setCapacity(capacity);
+	}
+
+	// ݵĴʱ䣬0ʾ
+	void setMemoCacheTTL(std::chrono::milliseconds ttl)
+	{
+		if (checkRunningState())
+			return;
+		memoCache_.setTTL(ttl);
+	}
+
+	// Ӧ߳߳[minThreadSize, maxThreadSize]֮Զ
+	// ÿintervalһʹɽhill climbing߳
+	// һεķ½仯Χ򱣳ֲ
+	void setAdaptiveSizing(int minThreadSize, int maxThreadSize,
+		std::chrono::milliseconds interval = std::chrono::milliseconds(ADAPTIVE_SAMPLE_INTERVAL))
+	{
+		if (checkRunningState())
+			return;
+		adaptive_ = true;
+		adaptiveMinThreadSize_ = std::max(1, minThreadSize);
+		adaptiveMaxThreadSize_ = std::max(adaptiveMinThreadSize_, maxThreadSize);
+		adaptiveInterval_ = interval;
+	}
+
+	// ȡ̳߳ص״̬ͳ
+	PoolStats getStats()
+	{
+		PoolStats stats;
+		stats.curThreadSize = curThreadSize_;
+		stats.idleThreadSize = idleThreadSize_;
+		stats.taskSize = taskSize_;
+		stats.completedTaskSize = completedTaskSize_;
+		stats.failedTaskSize = failedTaskSize_;
+		stats.rejectedTaskSize = rejectedTaskSize_;
+
+		std::lock_guard<std::mutex> lock(controllerMtx_);
+		stats.throughput = throughput_;
+		stats.targetThreadSize = targetThreadSize_;
+		stats.lastAdjustment = lastAdjustment_;
+		stats.adjustmentCount = adjustmentCount_;
+		return stats;
+	}
+
+	// ʧʱĻص׳쳣ִ߳е
+	// 쳣Ȼͨfutureظύߣص׳쳣
+	void setErrorHandler(std::function<void(std::exception_ptr)> handler)
+	{
+		if (checkRunningState())
+			return;
+		errorHandler_ = std::move(handler);
+	}
+
+	// ۶ϣͬһͬһͻͬһʧfailureThresholdκ
+	// cooldownʱύٽУfutureֱӵõTaskRejected쳣
+	// ȴһ̽ɹָʧ۶ϡfailureThresholdΪ0ʾرգĬϣ
+	void setCircuitBreaker(int failureThreshold, std::chrono::milliseconds cooldown)
+	{
+		if (checkRunningState())
+			return;
+		circuitThreshold_ = failureThreshold;
+		circuitCooldown_ = cooldown;
+	}
+
+	// ù߳ʱĻصִ߳еһ֮ǰãʼ߳״̬
+	void setWorkerInitHook(std::function<void(WorkerContext&)> hook)
+	{
+		if (checkRunningState())
+			return;
+		workerInitHook_ = std::move(hook);
+	}
+
+	// ù߳˳ʱĻص߳״̬
+	void setWorkerExitHook(std::function<void(WorkerContext&)> hook)
+	{
+		if (checkRunningState())
+			return;
+		workerExitHook_ = std::move(hook);
+	}
+
+	// ȡǰ̵߳ģ̳߳صĹ߳е÷nullptr
+	static WorkerContext* currentWorker()
+	{
+		return currentWorkerRef();
+	}
+
 	// ̳߳ύ
 	// ʹÿɱģ̣submitTaskԽĲ
 	// pool.submitTask(sum1, 10, 20);   csdn  ؿ  ֵ+۵ԭ
 	// ֵfuture<>
+	// ƶֵ򿽱ֵб棬ʱֻƶֻ֧ƶĺͲ
 	template<typename Func, typename... Args>
-	auto submitTask(Func&& func, Args&&... args) -> std::future<decltype(func(args...))>
+	auto submitTask(Func&& func, Args&&... args) -> std::future<TaskResult<Func, Args...>>
 	{
 		// 񣬷
-		using RType = decltype(func(args...));
-		auto task = std::make_shared<std::packaged_task<RType()>>(
-			std::bind(std::forward<Func>(func), std::forward<Args>(args)...));
-		std::future<RType> result = task->get_future();
+		using RType = TaskResult<Func, Args...>;
+		CircuitState* circuit = circuitState(func);
+		if (circuit != nullptr && !circuit->allow(circuitCooldown_))
+		{
+			return rejectTask<RType>("circuit breaker is open, submit task fail.");
+		}
 
-		// ȡ
-		std::unique_lock<std::mutex> lock(taskQueMtx_);
-		// ûύ1sжύʧܣ
-		if (!notFull_.wait_for(lock, std::chrono::seconds(1),
-			[&]()->bool { return taskQue_.size() < (size_t)taskQueMaxThreshHold_; }))
+		std::packaged_task<RType()> task(
+			[this, circuit, call = makeTaskCall(std::forward<Func>(func), std::forward<Args>(args)...)]() mutable {
+				return runTask(call, circuit);
+			});
+		std::future<RType> result = task.get_future();
+
+		// ύʧ
+		if (!pushTask(std::move(task)))
+		{
+			std::cerr << "task queue is full, submit task fail." << std::endl;
+			return rejectTask<RType>("task queue is full, submit task fail.");
+		}
+
+		// Result
+		return result;
+	}
+
+	// ̳߳ύݵͬkeyᱻ
+	// ͬһkeyĲύִֻһе߹ͬһshared_futuresingle-flight
+	// keyɵָҲmakeTaskKeyͲ
+	// pool.submitMemoTask(ThreadPool::makeTaskKey("sum1", 1, 2), sum1, 1, 2);
+	template<typename Func, typename... Args>
+	auto submitMemoTask(size_t key, Func&& func, Args&&... args) -> std::shared_future<TaskResult<Func, Args...>>
+	{
+		using RType = TaskResult<Func, Args...>;
+		std::shared_future<RType> result;
+		size_t id = 0;
+
+		// ռλύռλ֮ͬύֱõshared_future
+		auto promise = std::make_shared<std::promise<RType>>();
+		result = promise->get_future().share();
+		if (memoCache_.getOrInsert(key, result, id))
+		{
+			return result;
+		}
+
+		CircuitState* circuit = circuitState(func);
+		if (circuit != nullptr && !circuit->allow(circuitCooldown_))
+		{
+			memoCache_.erase(key, id);
+			rejectedTaskSize_++;
+			promise->set_exception(std::make_exception_ptr(
+				TaskRejected("circuit breaker is open, submit task fail.")));
+			return result;
+		}
+
+		auto call = makeTaskCall(std::forward<Func>(func), std::forward<Args>(args)...);
+		MemoCache* cache = &memoCache_;
+		bool ok = pushTask([this, promise, call = std::move(call), circuit, cache, key, id]() mutable {
+			try
+			{
+				auto guarded = [&]() { return runTask(call, circuit); };
+				setPromiseResult(*promise, guarded, std::is_void<RType>());
+				cache->markReady(key, id);
+			}
+			catch (...)
+			{
+				// ִʧܵĽ棬һύִ
+				cache->erase(key, id);
+				promise->set_exception(std::current_exception());
+			}
+		});
+
+		if (!ok)
+		{
+			memoCache_.erase(key, id);
+			rejectedTaskSize_++;
+			promise->set_exception(std::make_exception_ptr(
+				TaskRejected("task queue is full, submit task fail.")));
+		}
+		return result;
+	}
+
+	// ͲsubmitMemoTaskʹõkey
+	// Ҫ֧std::hash
+	template<typename... Args>
+	static size_t makeTaskKey(const std::string& name, const Args&... args)
+	{
+		size_t seed = std::hash<std::string>()(name);
+		int dummy[] = { 0, (hashCombine(seed, args), 0)... };
+		(void)dummy;
+		return seed;
+	}
+
+	// ̳߳ύȡ
+	// ĵһȡƣִʱ䳤Ӧöڼtoken.isCancelled()
+	// ȡfuture.get()׳TaskCancelled쳣
+	// pool.submitCancellableTask(CancellationToken::withTimeout(std::chrono::seconds(1)), func, 10, 20);
+	template<typename Func, typename... Args>
+	auto submitCancellableTask(CancellationToken token, Func&& func, Args&&... args)
+		-> std::future<TaskResult<Func, CancellationToken, Args...>>
+	{
+		using RType = TaskResult<Func, CancellationToken, Args...>;
+		CircuitState* circuit = circuitState(func);
+		if (circuit != nullptr && !circuit->allow(circuitCooldown_))
+		{
+			return rejectTask<RType>("circuit breaker is open, submit task fail.");
+		}
+
+		auto state = std::make_shared<CancellableState<RType>>();
+		std::future<RType> result = state->promise.get_future();
+
+		// ڶбȡֱfutureĽ֮ʱѾ
+		std::weak_ptr<CancellableState<RType>> weak = state;
+		auto cancelTask = [weak]() {
+			auto state = weak.lock();
+			if (state && !state->done.exchange(true))
+			{
+				state->promise.set_exception(std::make_exception_ptr(TaskCancelled()));
+			}
+		};
+		size_t callbackId = token.onCancel(cancelTask);
+
+		// ֹʱʱɶʱ߳ȡڶе񣬵߲Ҫȵ
+		TimerHandle deadline;
+		if (token.isCancelled())
+		{
+			// ύʱѾȡֹ߳ʱ䣬Ҫ
+			token.removeCallback(callbackId);
+			cancelTask();
+			return result;
+		}
+		if (token.state_->deadline != CancellationToken::Clock::time_point::max())
+		{
+			auto delay = std::chrono::duration_cast<std::chrono::milliseconds>(
+				token.state_->deadline - CancellationToken::Clock::now()) + std::chrono::milliseconds(1);
+			deadline = addTimer(delay, 0, cancelTask, true);
+		}
+
+		auto call = makeTaskCall(std::forward<Func>(func), token, std::forward<Args>(args)...);
+		bool ok = pushTask([this, state, call = std::move(call), circuit, token, callbackId, deadline]() mutable {
+			// Ѿӣֻ֮ԼѯisCancelled()
+			token.removeCallback(callbackId);
+			deadline.cancel();
+
+			if (state->done.exchange(true))
+				return; // Ѿȡ
+
+			// ڶеȴʱѾֹʱ
+			if (token.isCancelled())
+			{
+				state->promise.set_exception(std::make_exception_ptr(TaskCancelled()));
+				return;
+			}
+
+			try
+			{
+				auto guarded = [&]() { return runTask(call, circuit); };
+				setPromiseResult(state->promise, guarded, std::is_void<RType>());
+			}
+			catch (...)
+			{
+				state->promise.set_exception(std::current_exception());
+			}
+		});
+
+		if (!ok)
+		{
+			token.removeCallback(callbackId);
+			deadline.cancel();
+			if (!state->done.exchange(true))
+			{
+				rejectedTaskSize_++;
+				state->promise.set_exception(std::make_exception_ptr(
+					TaskRejected("task queue is full, submit task fail.")));
+			}
+		}
+		return result;
+	}
+
+	// ӳdelayִһ
+	// ʱɵĶʱ̹߳ںŷУȴڼ䲻ռù߳
+	TimerHandle schedule(std::chrono::milliseconds delay, std::function<void()> func)
+	{
+		return addTimer(delay, 0, std::move(func));
+	}
+
+	// ÿperiodִһ񣬵һperiodִ֮
+	// ִмչ̶Ƶʼ㣬ֱᲹִ
+	TimerHandle scheduleAtFixedRate(std::chrono::milliseconds period, std::function<void()> func)
+	{
+		uint64_t periodTicks = std::max<uint64_t>(1, (period.count() + TIMER_WHEEL_TICK - 1) / TIMER_WHEEL_TICK);
+		return addTimer(period, periodTicks, std::move(func));
+	}
+
+	// ̳߳
+	void start(int initThreadSize = std::thread::hardware_concurrency())
+	{
+		// ̳߳ص״̬
+		isPoolRunning_ = true;
+
+		// ¼ʼ̸߳
+		initThreadSize_ = initThreadSize;
+		curThreadSize_ = initThreadSize;
+
+		// ̶߳
+		for (int i = 0; i < initThreadSize_; i++)
+		{
+			// thread̶߳ʱ򣬰̺߳thread̶߳
+			auto ptr = std::make_unique<Thread>(std::bind(&ThreadPool::threadFunc, this, std::placeholders::_1));
+			int threadId = ptr->getId();
+			threads_.emplace(threadId, std::move(ptr));
+			// threads_.emplace_back(std::move(ptr));
+		}
+
+		// ߳  std::vector<Thread*> threads_;
+		// ߳idȫֵģͬһеĵڶ̳߳صid0ʼܰ±
+		for (auto& item : threads_)
+		{
+			item.second->start(); // Ҫȥִһ̺߳
+			idleThreadSize_++;    // ¼ʼ̵߳
+		}
+
+		// Ӧ߳
+		if (adaptive_)
+		{
+			targetThreadSize_ = initThreadSize_;
+			controller_ = std::thread(&ThreadPool::controllerFunc, this);
+		}
+	}
+
+	ThreadPool(const ThreadPool&) = delete;
+	ThreadPool& operator=(const ThreadPool&) = delete;
+
+private:
+	friend class TaskGroup;
+
+	// Task = 
+	// е񣬺std::function<void()>ƣֻƶܿ
+	// ֱӱpackaged_taskֻƶĺ󣬷ȡжֻƶĲ
+	class Task
+	{
+	public:
+		Task() = default;
+
+		template<typename Func, typename = std::enable_if_t<!std::is_same<std::decay_t<Func>, Task>::value>>
+		Task(Func&& func)
+			: impl_(new Impl<std::decay_t<Func>>(std::forward<Func>(func)))
+		{}
+
+		void operator()()
+		{
+			impl_->call();
+		}
+
+		explicit operator bool() const
+		{
+			return impl_ != nullptr;
+		}
+
+	private:
+		struct Base
+		{
+			virtual ~Base() = default;
+			virtual void call() = 0;
+		};
+
+		template<typename Func>
+		struct Impl : Base
+		{
+			template<typename F>
+			Impl(F&& f)
+				: func(std::forward<F>(f))
+			{}
+
+			void call() override
+			{
+				func();
+			}
+
+			Func func;
+		};
+
+		std::unique_ptr<Base> impl_;
+	};
+
+	// зƬÿƬԼύֻ߳ԼķƬ
+	// Ƭ֮ⲻͬƬͬһϣα
+	struct TaskQueShard
+	{
+		TaskQueShard()
+			: size(0)
+			, sleeping(0)
+			, wakeups(0)
+		{}
+
+		std::mutex mtx;
+		std::queue<Task> que;
+		std::atomic_int size; // ƬеɨƬʱжǷΪ
+		std::atomic_int sleeping; // ƬΪhome׼˯߻Ѿ˯ߵĹ߳
+		int wakeups; // ͶݸƬĻѴmtx˯ߵ߳һλѺɨзƬ
+		std::condition_variable notEmpty; // ƬΪhomeĹ߳˯
+		char padding[CACHE_LINE_SIZE];
+	};
+
+	// ̵߳ȴĽ
+	enum class WaitResult
+	{
+		TASK,    // ȡ
+		EXIT,    // ̳߳ҪѾȡ
+		RETIRE,  // ӦҪ߳
+		IDLE,    // cachedģʽ¿ʱ̫
+	};
+
+	// УҵȴtimeoutȻûп࣬false
+	// ֻԼķƬֻжʱҪȡtaskQueMtx_
+	// ֻзɹʱŻtaskʧʱ߻Լִ
+	bool pushTask(Task&& task, std::chrono::milliseconds timeout = std::chrono::seconds(1))
+	{
+		// ռһtaskSize_ѾռõûƬ񣬶Ǿȷ
+		if (!reserveTaskSlot())
+		{
+			// ȡ
+			std::unique_lock<std::mutex> lock(taskQueMtx_);
+			// ûύ1sжύʧܣ
+			waitingProducerSize_++;
+			bool ok = notFull_.wait_for(lock, timeout,
+				[&]()->bool { return reserveTaskSlot(); });
+			waitingProducerSize_--;
+			if (!ok)
+			{
+				// ʾnotFull_ȴ1s֣Ȼû
+				return false;
+			}
+		}
+
+		// п࣬뵱ǰ̶߳ӦķƬ
+		size_t index = producerShardIndex() % taskQueShardSize_;
+		TaskQueShard& shard = taskQueShards_[index];
+		bool woken = false;
+		{
+			std::lock_guard<std::mutex> lock(shard.mtx);
+			shard.que.emplace(std::move(task));
+			shard.size++;
+
+			// Ϊ·п϶ˣƬ߳˯ֱӻһ
+			if (shard.sleeping > 0)
+			{
+				shard.wakeups++;
+				shard.notEmpty.notify_one();
+				woken = true;
+			}
+		}
+
+		// ǰƬû˯ߵ̣߳Ƭ˯ߵ߳͵ȡ
+		if (!woken)
+		{
+			wakeWorker(index + 1);
+		}
+
+		// cachedģʽ ȽϽ С ҪͿ̵߳жǷҪµ̳߳
+		if (poolMode_ == PoolMode::MODE_CACHED
+			&& taskSize_ > idleThreadSize_
+			&& curThreadSize_ < threadSizeThreshHold_)
+		{
+			std::lock_guard<std::mutex> lock(taskQueMtx_);
+			if (curThreadSize_ < threadSizeThreshHold_)
+			{
+				std::cout << ">>> create new thread..." << std::endl;
+				addThread();
+			}
+		}
+
+		return true;
+	}
+
+	// ռһfalse
+	bool reserveTaskSlot()
+	{
+		if (taskSize_.fetch_add(1) < taskQueMaxThreshHold_)
+			return true;
+		taskSize_--;
+		return false;
+	}
+
+	// һ˯ߵḶ́߳indexƬʼ߳˯ߵķƬֻȡѷƬ
+	void wakeWorker(size_t index)
+	{
+		if (sleepingThreadSize_ == 0)
+			return;
+
+		for (int i = 0; i < taskQueShardSize_; i++)
+		{
+			TaskQueShard& shard = taskQueShards_[(index + i) % taskQueShardSize_];
+			if (shard.sleeping == 0)
+				continue;
+
+			std::lock_guard<std::mutex> lock(shard.mtx);
+			shard.wakeups++;
+			shard.notEmpty.notify_one();
+			return;
+		}
+	}
+
+	// ˯ߵḶ̳́߳߳ؽҪ߳ʱ
+	void wakeAllWorkers()
+	{
+		for (int i = 0; i < taskQueShardSize_; i++)
+		{
+			TaskQueShard& shard = taskQueShards_[i];
+			std::lock_guard<std::mutex> lock(shard.mtx);
+			shard.notEmpty.notify_all();
+		}
+	}
+
+	// ߳ȡʱhomeƬ˯ߣֱȡ߳Ҫ˳
+	// ȵǼ˯ټзƬ߷󿴵ǼǾͻͶһλѣѴɷƬ¼ᶪʧ
+	WaitResult waitTask(Task& task, int threadid, std::chrono::high_resolution_clock::time_point lastTime)
+	{
+		TaskQueShard& home = taskQueShards_[threadid % taskQueShardSize_];
+		for (;;)
+		{
+			home.sleeping++;
+			sleepingThreadSize_++;
+
+			WaitResult result = WaitResult::TASK;
+			bool waited = false;
+			bool woken = false;
+			if (popTask(task, threadid))
+				result = WaitResult::TASK;
+			else if (!isPoolRunning_)
+				result = WaitResult::EXIT;
+			else if (retireThreadSize_ > 0)
+				result = WaitResult::RETIRE;
+			else
+			{
+				std::unique_lock<std::mutex> lock(home.mtx);
+				auto wakeup = [&]()->bool {
+					return home.wakeups > 0 || !isPoolRunning_ || retireThreadSize_ > 0;
+				};
+				if (poolMode_ == PoolMode::MODE_CACHED)
+				{
+					// ʱ
+					woken = home.notEmpty.wait_for(lock, std::chrono::seconds(1), wakeup);
+				}
+				else
+				{
+					// ȴnotEmpty
+					home.notEmpty.wait(lock, wakeup);
+					woken = true;
+				}
+				if (home.wakeups > 0)
+				{
+					home.wakeups--;
+				}
+				waited = true;
+			}
+
+			sleepingThreadSize_--;
+			home.sleeping--;
+			if (!waited)
+				return result;
+
+			// ֮ɨзƬʱʱʱ
+			if (!woken)
+			{
+				auto now = std::chrono::high_resolution_clock().now();
+				auto dur = std::chrono::duration_cast<std::chrono::seconds>(now - lastTime);
+				if (dur.count() >= THREAD_MAX_IDLE_TIME
+					&& curThreadSize_ > initThreadSize_)
+				{
+					return WaitResult::IDLE;
+				}
+			}
+		}
+	}
+
+	// ߳˯ߺ˳ʱã߿ѾѻͶݸ̣߳ʣʱת˯ߵ߳
+	// ҪtaskQueMtx_߳Ѿ߳бɾڻȡ֮ǰ̳߳
+	void handOffWakeup(int threadid)
+	{
+		if (taskSize_ > 0)
 		{
-			// ʾnotFull_ȴ1s֣Ȼû
-			std::cerr << "task queue is full, submit task fail." << std::endl;
-			auto task = std::make_shared<std::packaged_task<RType()>>(
-				[]()->RType { return RType(); });
-			(*task)();
-			return task->get_future();
+			wakeWorker(threadid + 1);
 		}
+	}
 
-		// п࣬
-		// taskQue_.emplace(sp);  
-		// using Task = std::function<void()>;
-		taskQue_.emplace([task]() {(*task)();});
-		taskSize_++;
-
-		// Ϊ·п϶ˣnotEmpty_Ͻ֪ͨϿִ߳
-		notEmpty_.notify_all();
-
-		// cachedģʽ ȽϽ С ҪͿ̵߳жǷҪµ̳߳
-		if (poolMode_ == PoolMode::MODE_CACHED
-			&& taskSize_ > idleThreadSize_
-			&& curThreadSize_ < threadSizeThreshHold_)
+	// ӷƬȡһȡhomeƬɨƬзƬΪշfalse
+	bool popTask(Task& task, size_t home)
+	{
+		for (int i = 0; i < taskQueShardSize_; i++)
 		{
-			std::cout << ">>> create new thread..." << std::endl;
+			TaskQueShard& shard = taskQueShards_[(home + i) % taskQueShardSize_];
+			if (shard.size == 0)
+				continue;
 
-			// µ̶߳
-			auto ptr = std::make_unique<Thread>(std::bind(&ThreadPool::threadFunc, this, std::placeholders::_1));
-			int threadId = ptr->getId();
-			threads_.emplace(threadId, std::move(ptr));
-			// ߳
-			threads_[threadId]->start();
-			// ޸̸߳صı
-			curThreadSize_++;
-			idleThreadSize_++;
+			std::lock_guard<std::mutex> lock(shard.mtx);
+			if (shard.que.empty())
+				continue;
+			task = std::move(shard.que.front());
+			shard.que.pop();
+			shard.size--;
+			break;
 		}
+		if (!task)
+			return false;
 
-		// Result
-		return result;
+		taskSize_--;
+		return true;
 	}
 
-	// ̳߳
-	void start(int initThreadSize = std::thread::hardware_concurrency())
+	// ȡһãڵȴп֪֪ͨͨԼύ
+	// ߲ܳtaskQueMtx_
+	void notifyNotFull()
 	{
-		// ̳߳ص״̬
-		isPoolRunning_ = true;
-
-		// ¼ʼ̸߳
-		initThreadSize_ = initThreadSize;
-		curThreadSize_ = initThreadSize;
-
-		// ̶߳
-		for (int i = 0; i < initThreadSize_; i++)
+		if (waitingProducerSize_ > 0)
 		{
-			// thread̶߳ʱ򣬰̺߳thread̶߳
-			auto ptr = std::make_unique<Thread>(std::bind(&ThreadPool::threadFunc, this, std::placeholders::_1));
-			int threadId = ptr->getId();
-			threads_.emplace(threadId, std::move(ptr));
-			// threads_.emplace_back(std::move(ptr));
+			std::lock_guard<std::mutex> lock(taskQueMtx_);
+			notFull_.notify_all();
 		}
+	}
 
-		// ߳  std::vector<Thread*> threads_;
-		for (int i = 0; i < initThreadSize_; i++)
-		{
-			threads_[i]->start(); // Ҫȥִһ̺߳
-			idleThreadSize_++;    // ¼ʼ̵߳
-		}
+	// ǰύ̶߳ӦķƬͬһ߳ύͬһƬ
+	static size_t producerShardIndex()
+	{
+		static thread_local size_t index = std::hash<std::thread::id>()(std::this_thread::get_id());
+		return index;
 	}
 
-	ThreadPool(const ThreadPool&) = delete;
-	ThreadPool& operator=(const ThreadPool&) = delete;
+	// ڵǰִ߳һе񣬶Ϊշfalse
+	// ̵߳ȴTaskGroupʱãõȴʱæִ񣬱й̶߳
+	// ע⣺reset̵߳ݴڴȻЧ
+	bool runPendingTask()
+	{
+		Task task;
+		WorkerContext* worker = currentWorker();
+		if (!popTask(task, worker != nullptr ? worker->getId() : 0))
+			return false;
+		notifyNotFull();
+
+		task();
+		completedTaskSize_++;
+		return true;
+	}
 
-private:
 	// ̺߳
 	void threadFunc(int threadid)
 	{
 		auto lastTime = std::chrono::high_resolution_clock().now();
 
+		// ߳ģں߳ͬ
+		WorkerContext context(threadid, this);
+		currentWorkerRef() = &context;
+		if (workerInitHook_)
+		{
+			workerInitHook_(context);
+		}
+
 		// ִɣ̳߳زſԻ߳Դ
 		for (;;)
 		{
 			Task task;
-			{
-				// Ȼȡ
-				std::unique_lock<std::mutex> lock(taskQueMtx_);
 
+			// ȲֱӴӷƬȡȡٵhomeƬ˯
+			if (retireThreadSize_ > 0 || !popTask(task, threadid))
+			{
 				std::cout << "tid:" << std::this_thread::get_id()
 					<< "Իȡ..." << std::endl;
 
-				// cachedģʽ£пѾ˺̣ܶ߳ǿʱ䳬60sӦðѶ߳
-				// յinitThreadSize_߳Ҫлգ
-				// ǰʱ - һִ߳еʱ > 60s
+				// ӦҪ߳ǰ߳̿Уֱ˳
+				if (retireThreadSize_ > 0)
+				{
+					std::unique_lock<std::mutex> lock(taskQueMtx_);
+					if (retireWorker(context, lock, threadid))
+						return;
+				}
 
-				// ÿһзһ   ô֣ʱأִз
-				//  + ˫ж
-				while (taskQue_.size() == 0)
+				WaitResult result = waitTask(task, threadid, lastTime);
+				if (result != WaitResult::TASK)
 				{
-					// ̳߳Ҫ߳Դ
-					if (!isPoolRunning_)
+					std::unique_lock<std::mutex> lock(taskQueMtx_);
+					if (result == WaitResult::EXIT)
 					{
+						// ̳߳Ҫ߳Դ
+						exitWorker(context, lock);
 						threads_.erase(threadid); // std::this_thread::getid()
 						std::cout << "threadid:" << std::this_thread::get_id() << " exit!"
 							<< std::endl;
@@ -239,69 +1566,467 @@ private:
 						return; // ̺߳߳̽
 					}
 
-					if (poolMode_ == PoolMode::MODE_CACHED)
+					// cachedģʽ£пѾ˺̣ܶ߳ǿʱ䳬60sӦðѶ߳
+					// յinitThreadSize_߳Ҫлգ
+					// ǰʱ - һִ߳еʱ > 60s
+					if (result == WaitResult::IDLE && curThreadSize_ > initThreadSize_)
 					{
-						// ʱ
-						if (std::cv_status::timeout ==
-							notEmpty_.wait_for(lock, std::chrono::seconds(1)))
-						{
-							auto now = std::chrono::high_resolution_clock().now();
-							auto dur = std::chrono::duration_cast<std::chrono::seconds>(now - lastTime);
-							if (dur.count() >= THREAD_MAX_IDLE_TIME
-								&& curThreadSize_ > initThreadSize_)
-							{
-								// ʼյǰ߳
-								// ¼߳رֵ޸
-								// ̶߳߳бɾ   ûа취 threadFunc=thread
-								// threadid => thread => ɾ
-								threads_.erase(threadid); // std::this_thread::getid()
-								curThreadSize_--;
-								idleThreadSize_--;
-
-								std::cout << "threadid:" << std::this_thread::get_id() << " exit!"
-									<< std::endl;
-								return;
-							}
-						}
+						// ʼյǰ߳
+						// ¼߳رֵ޸
+						// ̶߳߳бɾ   ûа취 threadFunc=thread
+						// threadid => thread => ɾ
+						exitWorker(context, lock);
+						threads_.erase(threadid); // std::this_thread::getid()
+						curThreadSize_--;
+						idleThreadSize_--;
+
+						std::cout << "threadid:" << std::this_thread::get_id() << " exit!"
+							<< std::endl;
+						handOffWakeup(threadid);
+						return;
 					}
-					else
+
+					if (result == WaitResult::RETIRE && retireWorker(context, lock, threadid))
 					{
-						// ȴnotEmpty
-						notEmpty_.wait(lock);
+						handOffWakeup(threadid);
+						return;
 					}
-				}
 
-				idleThreadSize_--;
-
-				std::cout << "tid:" << std::this_thread::get_id()
-					<< "ȡɹ..." << std::endl;
-
-				// ȡһ
-				task = taskQue_.front();
-				taskQue_.pop();
-				taskSize_--;
+					// û߿߳ѾҪգȡ
+					continue;
+				}
 
-				// Ȼʣ񣬼ִ֪ͨ߳
-				if (taskQue_.size() > 0)
+				// Ȼʣ񣬼˯ߵִ߳
+				if (taskSize_ > 0)
 				{
-					notEmpty_.notify_all();
+					wakeWorker(threadid + 1);
 				}
+			}
+			notifyNotFull();
+
+			idleThreadSize_--;
 
-				// ȡһ񣬽֪֪ͨͨԼύ
-				notFull_.notify_all();
-			} // Ӧðͷŵ
+			std::cout << "tid:" << std::this_thread::get_id()
+				<< "ȡɹ..." << std::endl;
 
 			// ǰ̸ִ߳
-			if (task != nullptr)
+			if (task)
 			{
-				task(); // ִfunction<void()> 
+				task(); // ִ
 			}
+			completedTaskSize_++;
+			context.arena().reset(); // ݴһ
 
 			idleThreadSize_++;
 			lastTime = std::chrono::high_resolution_clock().now(); // ִ߳ʱ
 		}
 	}
 
+	// һµ̣߳ҪtaskQueMtx_
+	void addThread()
+	{
+		// µ̶߳
+		auto ptr = std::make_unique<Thread>(std::bind(&ThreadPool::threadFunc, this, std::placeholders::_1));
+		int threadId = ptr->getId();
+		threads_.emplace(threadId, std::move(ptr));
+		// ߳
+		threads_[threadId]->start();
+		// ޸̸߳صı
+		curThreadSize_++;
+		idleThreadSize_++;
+	}
+
+	// Ӷʱ񣬵һʱʱ߳
+	TimerHandle addTimer(std::chrono::milliseconds delay, uint64_t periodTicks, std::function<void()> func,
+		bool runOnTimerThread = false)
+	{
+		std::lock_guard<std::mutex> lock(timerMtx_);
+		if (!timerRunning_)
+		{
+			timerRunning_ = true;
+			timerThread_ = std::thread(&ThreadPool::timerFunc, this);
+		}
+
+		// ʱȡtick֤ǰִУһtick
+		uint64_t now = currentTimerTick();
+		timerWheel_.jumpTo(now);
+		const uint64_t tickUs = TIMER_WHEEL_TICK * 1000;
+		uint64_t expireUs = elapsedTimerUs() + std::max<int64_t>(0, delay.count()) * 1000;
+		uint64_t expireTick = std::max(now + 1, (expireUs + tickUs - 1) / tickUs);
+		auto timer = std::make_shared<TimerTask>(std::move(func), expireTick, periodTicks);
+		timer->runOnTimerThread = runOnTimerThread;
+		timerWheel_.add(timer);
+		timerCond_.notify_all();
+		return TimerHandle(timer);
+	}
+
+	// timerStartTime_ھ΢
+	uint64_t elapsedTimerUs() const
+	{
+		auto elapsed = std::chrono::steady_clock::now() - timerStartTime_;
+		return std::chrono::duration_cast<std::chrono::microseconds>(elapsed).count();
+	}
+
+	// timerStartTime_ھtick
+	uint64_t currentTimerTick() const
+	{
+		return elapsedTimerUs() / (TIMER_WHEEL_TICK * 1000);
+	}
+
+	// ʱ̺߳ÿtickǰһʱ֣ѵڵĶʱ
+	void timerFunc()
+	{
+		std::unique_lock<std::mutex> lock(timerMtx_);
+		while (timerRunning_)
+		{
+			if (timerWheel_.empty())
+			{
+				// ûжʱ񣬲Ҫÿtick
+				timerCond_.wait(lock);
+				continue;
+			}
+
+			uint64_t next = timerWheel_.currentTick() + 1;
+			timerCond_.wait_until(lock, timerStartTime_ + std::chrono::milliseconds(next * TIMER_WHEEL_TICK));
+			if (!timerRunning_)
+				break;
+
+			// ׷ϵǰʱ䣬һǰtick
+			std::vector<std::shared_ptr<TimerTask>> expired;
+			uint64_t now = currentTimerTick();
+			while (timerWheel_.currentTick() < now)
+			{
+				timerWheel_.advance(expired);
+			}
+			if (expired.empty())
+				continue;
+
+			// ʱtimerMtx_Ҳȴһtickٳ
+			// еִɺ·Żʱ֣ͬһ񲻻ͬʱִж
+			lock.unlock();
+			std::vector<std::shared_ptr<TimerTask>> retry; // ʧܵ
+			std::vector<std::shared_ptr<TimerTask>> periodic; // ڶʱִ߳ɡҪٴִе
+			for (auto& timer : expired)
+			{
+				if (timer->cancelled)
+					continue;
+
+				if (timer->runOnTimerThread)
+				{
+					// Ľֹʱ䣬ΪлѹƳ
+					timer->func();
+					if (timer->periodTicks > 0)
+						periodic.emplace_back(timer);
+					continue;
+				}
+
+				bool ok = pushTask([this, timer]() {
+					if (timer->cancelled)
+						return;
+					try
+					{
+						timer->func();
+					}
+					catch (...)
+					{
+						// ʱûfutureԴ쳣ֻ¼ʧܣӰ칤߳
+						onTaskFailed(nullptr, std::current_exception());
+					}
+
+					if (timer->periodTicks > 0 && !timer->cancelled)
+					{
+						std::lock_guard<std::mutex> lock(timerMtx_);
+						if (timerRunning_)
+						{
+							rearmTimer(timer);
+							timerCond_.notify_one(); // ʱֿΪգʱ߳ڵȴ
+						}
+					}
+				}, std::chrono::milliseconds(0));
+
+				if (!ok)
+					retry.emplace_back(timer);
+			}
+			lock.lock();
+
+			uint64_t current = timerWheel_.currentTick();
+			for (auto& timer : retry)
+			{
+				timer->expireTick = current + 1;
+				timerWheel_.add(timer);
+			}
+			for (auto& timer : periodic)
+			{
+				rearmTimer(timer);
+			}
+		}
+	}
+
+	// ִɺ·Żʱ֣ǰtickѾ
+	// ҪtimerMtx_
+	void rearmTimer(const std::shared_ptr<TimerTask>& timer)
+	{
+		timer->reschedule(timerWheel_.currentTick());
+		timerWheel_.add(timer);
+	}
+
+	// Ӧ̺߳߳
+	// лѹҹ̶߳æʱ̣̽߳ﵽԤھͼӣ
+	// û˵Ѿֲͣ䣬½
+	void controllerFunc()
+	{
+		long long lastCompleted = completedTaskSize_;
+		auto lastTime = std::chrono::steady_clock::now();
+		double lastThroughput = 0;
+		int probeDelta = 0; // һ̽ӵ߳һβʱЧ
+		double saturatedThroughput = 0; // ȷϱʱԱ仯֮ǰ̽
+
+		std::unique_lock<std::mutex> lock(controllerMtx_);
+		while (isPoolRunning_)
+		{
+			controllerCond_.wait_for(lock, adaptiveInterval_);
+			if (!isPoolRunning_)
+				break;
+
+			// ʹָƽٶ
+			// һε߳ʱ֮ǰĲӦɵ߳ƽڸǵЧ
+			long long completed = completedTaskSize_;
+			auto now = std::chrono::steady_clock::now();
+			double seconds = std::chrono::duration<double>(now - lastTime).count();
+			double sample = seconds > 0 ? (completed - lastCompleted) / seconds : 0;
+			throughput_ = (lastThroughput == 0 || lastAdjustment_ != 0) ? sample : 0.5 * throughput_ + 0.5 * sample;
+			lastCompleted = completed;
+			lastTime = now;
+
+			int current = curThreadSize_;
+			int step = std::max(1, current / ADAPTIVE_STEP_DIVISOR);
+			int delta = 0;
+			if (taskSize_ == 0)
+			{
+				// ûлѹύٶȣ𲽻նĿ߳
+				if (idleThreadSize_ > 1)
+					delta = -1;
+				saturatedThroughput = 0;
+			}
+			else if (probeDelta > 0 && lastThroughput > 0)
+			{
+				// ߳ӵıȽϣ߳Խһεı仯ԽСù̶ֵ
+				double change = (throughput_ - lastThroughput) / lastThroughput;
+				double expected = static_cast<double>(probeDelta) / std::max(1, current - probeDelta);
+				if (change > expected / 2)
+				{
+					// ߳Ч
+					delta = step;
+				}
+				else if (change < -ADAPTIVE_DAMPING)
+				{
+					// ½
+					delta = -probeDelta;
+					saturatedThroughput = lastThroughput;
+				}
+				else
+				{
+					saturatedThroughput = throughput_;
+				}
+			}
+			else if (idleThreadSize_ == 0 && (saturatedThroughput == 0
+				|| std::abs(throughput_ - saturatedThroughput) > saturatedThroughput * ADAPTIVE_DAMPING))
+			{
+				// лѹҹ̶߳æûȷϱͻ߸Ѿ仯̽߳
+				delta = step;
+			}
+			lastThroughput = throughput_;
+
+			int target = std::min(adaptiveMaxThreadSize_,
+				std::max(adaptiveMinThreadSize_, current + delta));
+			delta = target - current;
+			if (delta != 0)
+			{
+				adjustmentCount_++;
+			}
+			probeDelta = delta > 0 ? delta : 0;
+			targetThreadSize_ = target;
+			lastAdjustment_ = delta;
+
+			if (delta > 0)
+			{
+				std::lock_guard<std::mutex> queLock(taskQueMtx_);
+				for (int i = 0; i < delta; i++)
+				{
+					addThread();
+				}
+			}
+			else if (delta < 0)
+			{
+				// ֪ͨ߳˳
+				{
+					std::lock_guard<std::mutex> queLock(taskQueMtx_);
+					retireThreadSize_ = -delta;
+				}
+				wakeAllWorkers();
+			}
+		}
+	}
+
+	// ӦҪ߳ʱõǰ߳˳
+	// trueʾǰ߳Ѿ߳бɾ̺߳Ҫֱӷ
+	bool retireWorker(WorkerContext& context, std::unique_lock<std::mutex>& lock, int threadid)
+	{
+		if (retireThreadSize_ == 0)
+			return false;
+
+		retireThreadSize_--;
+		exitWorker(context, lock);
+		threads_.erase(threadid);
+		curThreadSize_--;
+		idleThreadSize_--;
+		exitCond_.notify_all();
+		return true;
+	}
+
+	// ߳˳ǰ˳ص
+	// صпܻ̳߳أͷе
+	void exitWorker(WorkerContext& context, std::unique_lock<std::mutex>& lock)
+	{
+		if (workerExitHook_)
+		{
+			lock.unlock();
+			workerExitHook_(context);
+			lock.lock();
+		}
+		currentWorkerRef() = nullptr;
+	}
+
+	// ǰ̵߳Ĺ߳
+	static WorkerContext*& currentWorkerRef()
+	{
+		static thread_local WorkerContext* current = nullptr;
+		return current;
+	}
+
+	// ȡĹ״̬done֤ȡִֻһpromise
+	template<typename RType>
+	struct CancellableState
+	{
+		CancellableState()
+			: done(false)
+		{}
+
+		std::promise<RType> promise;
+		std::atomic_bool done;
+	};
+
+	// ִ׳쳣ʱ¼ʧܺ׳futureߵߴ
+	// try/catchڲ׳쳣ʱûж⿪ûп۶ʱcircuitΪnullptrɹ·ʲô
+	template<typename Call>
+	auto runTask(Call& call, CircuitState* circuit) -> decltype(call())
+	{
+		CircuitGuard guard(circuit);
+		try
+		{
+			return call();
+		}
+		catch (const TaskCancelled&)
+		{
+			// ȡʧ
+			guard.dismiss();
+			throw;
+		}
+		catch (...)
+		{
+			guard.dismiss();
+			onTaskFailed(circuit, std::current_exception());
+			throw;
+		}
+	}
+
+	// ʱʱûбdismiss¼ɹָ۶״̬
+	class CircuitGuard
+	{
+	public:
+		CircuitGuard(CircuitState* circuit)
+			: circuit_(circuit)
+		{}
+		~CircuitGuard()
+		{
+			if (circuit_ != nullptr)
+				circuit_->recordSuccess();
+		}
+		void dismiss()
+		{
+			circuit_ = nullptr;
+		}
+	private:
+		CircuitState* circuit_;
+	};
+
+	// ¼һʧܣֻ׳쳣ʱ
+	void onTaskFailed(CircuitState* circuit, std::exception_ptr error)
+	{
+		failedTaskSize_++;
+		if (circuit != nullptr)
+		{
+			circuit->recordFailure(circuitThreshold_, circuitCooldown_);
+		}
+		if (errorHandler_)
+		{
+			try
+			{
+				errorHandler_(error);
+			}
+			catch (...)
+			{
+			}
+		}
+	}
+
+	// ȡһ۶״̬ûп۶Ϸnullptr
+	// ȼǷ۶ټûпʱύҪĲ
+	// ״̬̳߳صڲͷţпֱӱָ
+	template<typename Func>
+	CircuitState* circuitState(const Func& func)
+	{
+		if (circuitThreshold_ <= 0)
+			return nullptr;
+		return circuits_.get(TaskClassOf<std::decay_t<Func>>::get(func));
+	}
+
+	// ûнУһTaskRejected쳣future
+	template<typename RType>
+	std::future<RType> rejectTask(const std::string& reason)
+	{
+		rejectedTaskSize_++;
+		std::promise<RType> promise;
+		promise.set_exception(std::make_exception_ptr(TaskRejected(reason)));
+		return promise.get_future();
+	}
+
+	// ִндpromiseֵַǷΪvoid
+	template<typename RType, typename Call>
+	static void setPromiseResult(std::promise<RType>& promise, Call& call, std::false_type)
+	{
+		promise.set_value(call());
+	}
+
+	template<typename RType, typename Call>
+	static void setPromiseResult(std::promise<RType>& promise, Call& call, std::true_type)
+	{
+		call();
+		promise.set_value();
+	}
+
+	// һhashֵϲseedУboost::hash_combine
+	template<typename T>
+	static void hashCombine(size_t& seed, const T& value)
+	{
+		seed ^= std::hash<T>()(value) + 0x9e3779b9 + (seed << 6) + (seed >> 2);
+	}
+
+	static void hashCombine(size_t& seed, const char* value)
+	{
+		hashCombine(seed, std::string(value));
+	}
+
 	// pool״̬
 	bool checkRunningState() const
 	{
@@ -316,19 +2041,170 @@ private:
 	std::atomic_int curThreadSize_;	// ¼ǰ̵̳߳߳
 	std::atomic_int idleThreadSize_; // ¼̵߳
 
-	// Task = 
-	using Task = std::function<void()>;
-	std::queue<Task> taskQue_; // 
+	std::unique_ptr<TaskQueShard[]> taskQueShards_; // УֳtaskQueShardSize_Ƭ
+	int taskQueShardSize_; // зƬ
 	std::atomic_int taskSize_; // 
 	int taskQueMaxThreshHold_;  // ֵ
+	std::atomic_int sleepingThreadSize_; // зƬ˯ߵ߳
+	std::atomic_int waitingProducerSize_; // notFull_ϵȴ
 
 	std::mutex taskQueMtx_; // ֤е̰߳ȫ
 	std::condition_variable notFull_; // ʾв
-	std::condition_variable notEmpty_; // ʾв
 	std::condition_variable exitCond_; // ȵ߳Դȫ
 
+	MemoCache memoCache_; // ݵĽ
+
+	std::function<void(WorkerContext&)> workerInitHook_; // ߳ص
+	std::function<void(WorkerContext&)> workerExitHook_; // ߳˳ص
+
 	PoolMode poolMode_; // ǰ̳߳صĹģʽ
 	std::atomic_bool isPoolRunning_; // ʾǰ̳߳ص״̬
+
+	std::atomic<long long> completedTaskSize_; // Ѿִɵ
+	std::atomic<long long> failedTaskSize_; // ִʱ׳쳣
+	std::atomic<long long> rejectedTaskSize_; // ûִоͱܾ
+
+	// ʧܴ
+	std::function<void(std::exception_ptr)> errorHandler_; // ʧʱĻص
+	int circuitThreshold_; // ʧܶٴκ۶ϣ0ʾ۶
+	std::chrono::milliseconds circuitCooldown_; // ۶ϵȴʱ
+	CircuitTable circuits_; // ÿ۶״̬
+	std::atomic_int retireThreadSize_; // Ҫ˳Ŀ߳
+
+	// Ӧ߳
+	bool adaptive_; // Ƿ
+	int adaptiveMinThreadSize_; // ߳
+	int adaptiveMaxThreadSize_; // ߳
+	std::chrono::milliseconds adaptiveInterval_; // 
+	std::thread controller_; // ߳
+	std::mutex controllerMtx_; // ״̬
+	std::condition_variable controllerCond_; // ̳߳ʱѿ
+	double throughput_; // һβ
+	int targetThreadSize_; // ߳
+	int lastAdjustment_; // һε߳
+	long long adjustmentCount_; // ܴ߳
+
+	// ʱ
+	TimerWheel timerWheel_; // ʱ֣timerMtx_
+	std::thread timerThread_; // ʱ̣߳һӶʱʱ
+	std::mutex timerMtx_;
+	std::condition_variable timerCond_; // µĶʱ̳߳ʱ֪ͨ
+	bool timerRunning_; // ʱ߳Ƿ
+	std::chrono::steady_clock::time_point timerStartTime_; // tick 0 Ӧʱ
+};
+
+// ṹfork-join
+// пԴTaskGroupύ񲢵ȴ߳wait()лæִже
+// ڹ̶̵̳߳߳еݹطҲΪ̶߳ڵȴ
+//
+// TaskGroup group(pool);
+// group.spawn(sort, begin, mid);
+// group.spawn(sort, mid, end);
+// group.wait();
+class TaskGroup
+{
+public:
+	TaskGroup(ThreadPool& pool)
+		: pool_(pool)
+		, state_(std::make_shared<State>())
+	{}
+
+	// ʱȴɣ쳣
+	~TaskGroup()
+	{
+		try
+		{
+			wait();
+		}
+		catch (...)
+		{
+		}
+	}
+
+	// ύһ
+	// ʱֱڵǰִ߳Уȴп
+	template<typename Func, typename... Args>
+	void spawn(Func&& func, Args&&... args)
+	{
+		auto call = makeTaskCall(std::forward<Func>(func), std::forward<Args>(args)...);
+		auto state = state_;
+		state->pending++;
+
+		ThreadPool* pool = &pool_;
+		ThreadPool::Task task = [pool, state, call = std::move(call)]() mutable {
+			try
+			{
+				pool->runTask(call, nullptr);
+			}
+			catch (...)
+			{
+				std::lock_guard<std::mutex> lock(state->mtx);
+				if (!state->error)
+					state->error = std::current_exception();
+			}
+
+			std::lock_guard<std::mutex> lock(state->mtx);
+			if (--state->pending == 0)
+				state->cond.notify_all();
+		};
+
+		if (!pool_.pushTask(std::move(task), std::chrono::milliseconds(0)))
+		{
+			task();
+		}
+	}
+
+	// ȴɣ׳쳣ʱ׳һ쳣
+	void wait()
+	{
+		WorkerContext* worker = ThreadPool::currentWorker();
+		bool helping = worker != nullptr && worker->getPool() == &pool_;
+
+		while (state_->pending > 0)
+		{
+			// ǰ̳߳߳صḶִ́߳же
+			if (helping && pool_.runPendingTask())
+				continue;
+
+			// ΪգѾ߳ȡߣȴ
+			// ̶߳Ƿ˿԰æִе
+			std::unique_lock<std::mutex> lock(state_->mtx);
+			if (helping)
+				state_->cond.wait_for(lock, std::chrono::milliseconds(1),
+					[&]()->bool { return state_->pending == 0; });
+			else
+				state_->cond.wait(lock, [&]()->bool { return state_->pending == 0; });
+		}
+
+		std::exception_ptr error;
+		{
+			std::lock_guard<std::mutex> lock(state_->mtx);
+			error = state_->error;
+			state_->error = nullptr;
+		}
+		if (error)
+			std::rethrow_exception(error);
+	}
+
+	TaskGroup(const TaskGroup&) = delete;
+	TaskGroup& operator=(const TaskGroup&) = delete;
+
+private:
+	// ״̬ܱTaskGroupøãwaitص֮䣩
+	struct State
+	{
+		State()
+			: pending(0)
+		{}
+
+		std::atomic_int pending; // ûɵ
+		std::mutex mtx;
+		std::condition_variable cond; // ʱ֪ͨ
+		std::exception_ptr error; // һ쳣
+	};
+
+	ThreadPool& pool_;
+	std::shared_ptr<State> state_;
 };
 
 #endif